@@ -3,6 +3,9 @@
 import pygame
 import sys
 import importlib
+import threading
+
+from games import fonts, idle, layers, profiler, text_cache
 
 # Define colors used in the game interface, using RGB values
 COLORS = {
@@ -21,8 +24,10 @@ pygame.display.set_caption('Arcade Classics Collection')
 WINDOW_WIDTH, WINDOW_HEIGHT = 800, 600
 # Create the game window with predefined dimensions
 game_window = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-# Create the font for text, using Arial and size 36
-font = pygame.font.SysFont('times new roman', 36)
+# Font specs (name, size) for text, rendered through the shared text cache
+font = fonts.font('times new roman', 36)
+title_font = fonts.font('times new roman', 48)
+fonts.warm_up()  # Resolve the launcher's fonts once at startup
 # Initialize a clock for managing frame rate
 clock = pygame.time.Clock()
 
@@ -33,6 +38,20 @@ BUTTON_HEIGHT = 50  # Example height
 # A global variable to store which game is currently being played
 current_game = None
 
+# Games offered by the launcher; each lives in games/<name>.py
+GAMES = ['Snake', 'Minesweeper', 'Memory', 'Hangman']
+
+# Import the game modules in a background thread while the menu is idle, so launching one is instant.
+# Game modules have no import-time side effects; they only draw once init() hands them a surface.
+def preload_games():
+    def load():
+        for game_name in GAMES:
+            try:
+                importlib.import_module(f"games.{game_name.lower()}")
+            except ImportError as error:
+                print(f"Could not preload {game_name}: {error}")
+    threading.Thread(target=load, name='preload-games', daemon=True).start()
+
 # Class to create buttons within the main menu interface
 class Button:
     def __init__(self, x, y, text, action=None):
@@ -56,8 +75,8 @@ class Button:
         # Draw the button's main rectangle
         pygame.draw.rect(win, self.color, (self.x, self.y, self.width, self.height), 0)
         # Render the button's text in the center of the button
-        text_render = font.render(self.text, True,
-                                  COLORS['white'])  # Render text to a surface with anti-aliasing and black color
+        text_render = text_cache.render(font, self.text,
+                                        COLORS['white'])  # Cached anti-aliased text surface in white
         # win.blit: draws the text_render surface onto the game window at the calculated position.
         win.blit(text_render,
                  (self.x + (self.width - text_render.get_width()) // 2,
@@ -71,70 +90,187 @@ class Button:
         # Check if the cursor is within the button's boundaries
         return self.x < pos[0] < self.x + self.width and self.y < pos[1] < self.y + self.height
 
-    # Method to handle mouse click events on the button
-    def handle_event(self, event):
-        # Check if the mouse button is pressed down
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            pos = pygame.mouse.get_pos()  # Get the position of the mouse cursor
-            # If the mouse is over the button when clicked, execute the button's action
-            if self.is_over(pos) and self.action:
-                self.action()
+# Base class for one screen of the launcher. Scenes never call each other; they ask the
+# scene manager to push, pop or replace scenes, and the manager's single loop drives the top one.
+class Scene:
+    animating = False  # Scenes that move on their own are drawn every frame; others only after input
+
+    def enter(self):  # Called whenever the scene becomes the active (top) scene
+        pass
+
+    def handle_event(self, event, manager):  # React to one pygame event
+        pass
+
+    def update(self, manager):  # Advance the scene by one frame
+        pass
+
+    def draw(self, win):  # Draw the scene onto the given surface
+        pass
+
+# Keeps the scenes in an explicit stack and runs the one main loop of the application
+class SceneManager:
+    def __init__(self, scene):
+        self.stack = [scene]  # Bottom of the stack is the main menu; its depth stays constant
+        self.scheduler = idle.IdleScheduler(60, clock)  # Maintain 60 frames per second, or sleep while idle
+        scene.enter()
+
+    def push(self, scene):  # Show a new scene on top of the current one
+        self.stack.append(scene)
+        self.enter(scene)
+
+    def pop(self):  # Drop the current scene and return to the one below it
+        self.stack.pop()
+        if self.stack:
+            self.enter(self.stack[-1])
+
+    def replace(self, scene):  # Swap the current scene for another one, freeing the old one
+        self.stack[-1] = scene
+        self.enter(scene)
+
+    def enter(self, scene):
+        scene.enter()
+        self.scheduler.request_frame()  # Draw the new scene without waiting for input
+
+    def quit(self):  # Empty the stack, which ends the main loop
+        self.stack.clear()
+
+    def run(self):
+        stats = profiler.get('launcher')
+        while self.stack:
+            scene = self.stack[-1]
+            stats.begin_frame()
+            self.scheduler.animating = scene.animating or stats.overlay_visible
+            events = self.scheduler.poll()  # While the menu is idle this sleeps until input arrives
+            # Event handling loop to process user inputs
+            with stats.section('events'):
+                for event in events:
+                    if event.type == pygame.QUIT:  # User closed the window
+                        self.quit()
+                        break
+                    if stats.handle_event(event):
+                        continue  # The next frame redraws the whole screen, so a hidden overlay leaves no trace
+                    scene.handle_event(event, self)
+                    if not self.stack or self.stack[-1] is not scene:
+                        break  # The scene changed; leave the remaining events to the new scene
+            if self.stack and self.stack[-1] is scene:
+                with stats.section('update'):
+                    scene.update(self)
+                if not self.stack or self.stack[-1] is not scene:
+                    continue  # The scene left during its update (a game ended); the next scene draws itself
+                if not self.scheduler.dirty:
+                    continue  # Nothing changed, so the screen still shows the last frame
+                with stats.section('draw'):
+                    scene.draw(game_window)
+                    stats.draw_overlay(game_window)
+                with stats.section('present'):
+                    pygame.display.update()  # Refresh the display
+                stats.end_frame(clock)
+        stats.dump()  # Write the recorded frame times, if any, before closing
+        pygame.quit()
+        sys.exit()
+
+# Screen with a title, a message and a column of buttons, shared by the main menu and game over screens.
+# None of it changes while the screen is shown, so it is drawn once into a cached layer.
+class MenuScene(Scene):
+    caption = 'Arcade Classics Collection'
+    message = ''
+
+    def __init__(self):
+        # Render text with anti-aliasing for smoother text
+        self.title_text = text_cache.render(title_font, 'Arcade Games Collection', COLORS['green'])  # Title in green
+        self.message_text = text_cache.render(font, self.message, COLORS['red'])  # Message text in red
+        self.buttons = []
+        self.button_rows = None  # Bands of BUTTON_HEIGHT pixels -> buttons overlapping them, built on first click
+        self.layer = layers.Layer((WINDOW_WIDTH, WINDOW_HEIGHT), self.draw_static)
+
+    def enter(self):
+        # Set the title of the window and clear the screen to the dark background
+        pygame.display.set_caption(self.caption)
+        game_window.fill(COLORS['black'])
+
+    def handle_event(self, event, manager):
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left mouse button was pressed
+            button = self.button_at(event.pos)
+            if button is not None:
+                button.action(manager)
+
+    # Find the button under a position by looking only at the buttons in its horizontal band
+    def button_at(self, pos):
+        if self.button_rows is None:
+            self.button_rows = {}
+            for button in self.buttons:
+                for row in range(button.y // BUTTON_HEIGHT, (button.y + button.height) // BUTTON_HEIGHT + 1):
+                    self.button_rows.setdefault(row, []).append(button)
+        for button in self.button_rows.get(pos[1] // BUTTON_HEIGHT, ()):
+            if button.is_over(pos):
+                return button
+        return None
+
+    def draw_static(self, win):
+        win.fill(COLORS['black'])
+        # Draw the title and message text at calculated positions to center them
+        win.blit(self.title_text, (WINDOW_WIDTH // 2 - self.title_text.get_width() // 2, 20))
+        win.blit(self.message_text, (WINDOW_WIDTH // 2 - self.message_text.get_width() // 2, 80))
+
+        # Draw each button with a white outline for visibility
+        for button in self.buttons:
+            button.draw(win, COLORS['white'])
+
+    def draw(self, win):
+        self.layer.draw(win)  # A single blit per frame
 
 # Display the main menu and handle user interactions from a list of games to play.
-def main_menu():
-    global current_game  # Reference global variable to manage the state of the game currently being played
-    current_game = None  # Reset the current game to None
-
-    # Set the title of the window
-    pygame.display.set_caption('Arcade Classics Collection')
-
-    # Set the background of the main menu to dark grey
-    game_window.fill(COLORS['black'])
-
-    # Setup fonts for text display on the main menu
-    title_font = pygame.font.SysFont('times new roman', 48)  # main title
-    message_font = font  # sub-messages or instructions
-
-    # Render the title and instruction text with anti-aliasing enabled
-    title_text = title_font.render('Arcade Games Collection', True, COLORS['green'])  # Title in green
-    message_text = message_font.render('Select game', True, COLORS['red'])  # Message text in red
-
-    # Define buttons for each available game using a centralized x coordinate and staggered y coordinates
-    snake_btn = Button(WINDOW_WIDTH // 2, 200, 'Snake')
-    minesweeper_btn = Button(WINDOW_WIDTH // 2, 300, 'Minesweeper')
-    memory_btn = Button(WINDOW_WIDTH // 2, 400, 'Memory')
-    hangman_btn = Button(WINDOW_WIDTH // 2, 500, 'Hangman')
-    buttons = [snake_btn, minesweeper_btn, memory_btn, hangman_btn]  # List of button objects for easy management
-
-    running = True  # Control variable for the main menu loop
-    while running:
-        # Draw the title and instruction text on the window at calculated positions to center them
-        game_window.blit(title_text, (WINDOW_WIDTH // 2 - title_text.get_width() // 2, 20))
-        game_window.blit(message_text, (WINDOW_WIDTH // 2 - message_text.get_width() // 2, 80))
-
-        # Draw each button on the main menu screen
-        for button in buttons:
-            button.draw(game_window, COLORS['white'])  # white color for button outline
-
-        # Event handling loop to process user inputs
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:  # User closed the window
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left mouse button was pressed
-                    for button in buttons:
-                        # Check if the click was on any of the buttons
-                        if button.is_over(event.pos):
-                            current_game = button.text  # Update current game based on button text
-                            print('Game launched:', current_game)
-                            run_game(current_game)  # Launch the selected game
-
-        pygame.display.update()  # Refresh the display
-        clock.tick(60)  # Maintain 60 frames per second
-
-# Def run_game: running the selected game and handle its termination
+class MainMenuScene(MenuScene):
+    message = 'Select game'
+
+    def __init__(self):
+        super().__init__()
+        # Define buttons for each available game using a centralized x coordinate and staggered y coordinates
+        self.buttons = [Button(WINDOW_WIDTH // 2, 200 + i * 100, game_name, self.launch(game_name))
+                        for i, game_name in enumerate(GAMES)]
+
+    def enter(self):
+        global current_game  # Reference global variable to manage the state of the game currently being played
+        current_game = None  # Reset the current game to None
+        super().enter()
+
+    @staticmethod
+    def launch(game_name):
+        def action(manager):
+            print('Game launched:', game_name)
+            manager.push(GameScene(game_name))  # Launch the selected game
+        return action
+
+# Runs one game session; the game's own loop runs inside this scene's update
+class GameScene(Scene):
+    def __init__(self, game_name):
+        self.game_name = game_name
+
+    def enter(self):
+        global current_game
+        current_game = self.game_name  # Update current game
+
+    def update(self, manager):
+        run_game(self.game_name)
+        manager.replace(GameOverScene(self.game_name))  # Show the game over screen in place of the game
+
+# Display the game over screen with options to return to the main menu, play again, or quit.
+class GameOverScene(MenuScene):
+    caption = 'Game Over'
+    message = 'Game Over'
+
+    def __init__(self, game_name):
+        super().__init__()
+        self.game_name = game_name
+        # Create buttons to navigate from the game over screen
+        self.buttons = [
+            Button(WINDOW_WIDTH // 2, 225, 'Main Menu', lambda manager: manager.pop()),  # Return to the main menu
+            Button(WINDOW_WIDTH // 2, 350, f'Play {game_name} Again',
+                   lambda manager: manager.replace(GameScene(game_name))),  # Restart the game
+            Button(WINDOW_WIDTH // 2, 475, 'Quit', lambda manager: manager.quit())  # Quit the application
+        ]
+
+# Def run_game: running the selected game and return once it ends
 def run_game(game_name):
     # Normalize the game name to lowercase for the module and construct the function name
     module_name = f"games.{game_name.lower()}"
@@ -147,6 +283,9 @@ def run_game(game_name):
         # Get the specific function from the module using getattr
         game_function = getattr(game_module, function_name)
 
+        # Let the game draw on the launcher's window instead of creating a new one
+        game_module.init(game_window)
+
         # Execute the game function
         game_function()
     except ModuleNotFoundError:
@@ -154,67 +293,11 @@ def run_game(game_name):
             f"Module for {game_name} not found. Please check that the file {game_name.lower()}.py exists in the 'games' directory.")
     except AttributeError:
         print(f"Function {function_name} not found in the {game_name.lower()} module. Please ensure it is defined.")
-    finally:
-        # Call game_over after attempting to run the game
-        game_over()
 
-# Display the game over screen with options to return to the main menu, play again, or quit.
-def game_over():
-    global current_game  # Use the global variable to manage the game state
-
-    # Clear the screen and set background to dark grey
-    game_window.fill(COLORS['black'])
-
-    # Set the title of the window
-    pygame.display.set_caption('Game Over')
-
-    # Set up title and message
-    title_font = pygame.font.SysFont('times new roman', 48)  # main title
-    message_font = font  # secondary messages
-
-    # Render text with anti-aliasing for smoother text
-    title_text = title_font.render('Arcade Games Collection', True, COLORS['green'])
-    message_text = message_font.render('Game Over', True, COLORS['red'])
-
-    # Create buttons to navigate from the game over screen
-    main_menu_btn = Button(WINDOW_WIDTH // 2, 225, 'Main Menu')  # Button to return to the main menu
-    play_again_btn = Button(WINDOW_WIDTH // 2, 350, f'Play {current_game} Again')  # Button to replay the current game
-    quit_btn = Button(WINDOW_WIDTH // 2, 475, 'Quit')  # Button to quit the application
-    buttons = [main_menu_btn, play_again_btn, quit_btn]  # List of buttons for easy management
-
-    running = True  # Control variable for the game over loop
-    while running:
-        # Display the title and message at the center of the screen
-        game_window.blit(title_text, (WINDOW_WIDTH // 2 - title_text.get_width() // 2, 20))
-        game_window.blit(message_text, (WINDOW_WIDTH // 2 - message_text.get_width() // 2, 80))
-
-        # Draw each button with an optional white outline for visibility
-        for button in buttons:
-            button.draw(game_window, COLORS['white'])
-
-        # Event handling loop to process user inputs
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:  # User closed the window
-                pygame.quit()
-                sys.exit()
-
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Check if the left mouse button was pressed
-                    for button in buttons:
-                        # Check if the click was on any of the buttons
-                        if button.is_over(event.pos):
-                            if button.text == 'Main Menu':
-                                return main_menu()  # Return to the main menu
-                            elif button.text == f'Play {current_game} Again':
-                                run_game(current_game)  # Restart the game
-
-                            elif button.text == 'Quit':  # Quit
-                                pygame.quit()
-                                sys.exit()
-
-        # Update the display and enforce a frame rate of 60 fps
-        pygame.display.update()
-        clock.tick(60)
+# Start the application with the main menu at the bottom of the scene stack
+def main_menu():
+    SceneManager(MainMenuScene()).run()
 
 if __name__ == '__main__':
+    preload_games()  # Load the games in the background while the menu is shown
     main_menu()  # Start the application by displaying the main menu
@@ -0,0 +1,336 @@
+# Benchmarks for the game-logic and rendering hot paths
+# Run from the arcade_classics_collection directory:
+#   python -m benchmarks.run [-o results.json] [--compare baseline.json] [-k filter]
+# Every benchmark is timed for several board or snake sizes without opening a window. Results are
+# written as JSON (one record per benchmark and size), so runs on two commits can be compared.
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Draw benchmarks render to an offscreen surface
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')  # Keep the output machine-readable
+
+import pygame
+
+from games import fonts, hangman, memory, minesweeper, snake, word_source
+from games.minesweeper_board import MinesweeperBoard
+from games.snake_engine import Snake, SnakeEngine
+
+REPEAT = 7  # Timed rounds per case; the report keeps the best and the median
+MIN_ROUND_TIME = 0.02  # Seconds a round should last, reached by calling the case several times
+REGRESSION_THRESHOLD = 1.25  # --compare flags cases that got this much slower
+
+BENCHMARKS = []  # (name, cases, setup) in registration order
+
+
+def benchmark(name, cases):
+    """Register a benchmark: `setup(**case)` prepares untimed state and returns the callable to time.
+
+    setup is called again before every round, so callables may change the state they work on.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, cases, setup))
+        return setup
+    return register
+
+
+def measure(setup, case, repeat=REPEAT):
+    """Time one case; returns per-call seconds for every round."""
+    # Calibrate how many calls make a round long enough to time reliably
+    number = 1
+    while True:
+        call = setup(**case)
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND_TIME or number >= 1 << 16:
+            break
+        number *= 2 if elapsed * 4 >= MIN_ROUND_TIME else 8
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        call = setup(**case)
+        start = time.perf_counter()
+        for _ in range(number):
+            call()
+        rounds.append((time.perf_counter() - start) / number)
+    return rounds, number
+
+
+# Minesweeper: square boards with about one mine per ten cells; sparse boards for large flood fills
+MINESWEEPER_SIZES = [{'size': 10, 'mines': 10}, {'size': 100, 'mines': 1000}, {'size': 300, 'mines': 9000}]
+FLOOD_SIZES = [{'size': 10, 'mines': 2}, {'size': 100, 'mines': 50}, {'size': 300, 'mines': 200}]
+
+
+@benchmark('minesweeper.create_grid', MINESWEEPER_SIZES)
+def bench_create_grid(size, mines):
+    board = MinesweeperBoard(size, size, mines, seed=1)
+    return lambda: minesweeper.create_grid(board)
+
+
+@benchmark('minesweeper.Cell.reveal', FLOOD_SIZES)
+def bench_cell_reveal(size, mines):
+    board = MinesweeperBoard(size, size, mines, seed=1)
+    grid = minesweeper.create_grid(board)
+    # Start on an empty cell so the reveal floods the open area around it
+    x, y = next((x, y) for x in range(size) for y in range(size)
+                if not board.mines[x, y] and board.adjacent[x, y] == 0)
+    cell = grid[x][y]
+    # Later calls in a round find the cell revealed; covering the board again keeps every call a full
+    # flood, and is two array writes so the time stays that of the reveal
+    def reveal():
+        cell.reveal(grid)
+        board.revealed[:] = False
+        board.hidden_safe = size * size - mines
+    return reveal
+
+
+@benchmark('minesweeper.check_win_condition', MINESWEEPER_SIZES)
+def bench_check_win_condition(size, mines):
+    board = MinesweeperBoard(size, size, mines, seed=1)
+    return lambda: minesweeper.check_win_condition(board)
+
+
+@benchmark('minesweeper.draw_grid', [{'size': 10, 'mines': 10}, {'size': 30, 'mines': 90}])
+def bench_minesweeper_draw(size, mines):
+    board = MinesweeperBoard(size, size, mines, seed=1)
+    grid = minesweeper.create_grid(board)
+    for column in grid[::2]:  # Mix covered, revealed and flagged cells
+        for cell in column:
+            cell.force_reveal()
+    grid[1][1].flagged = True
+    # A full redraw, as DirtyCells.flush does on the first frame
+    def draw():
+        minesweeper.game_window.fill(minesweeper.COLORS['black'])
+        for row in grid:
+            for cell in row:
+                cell.draw()
+    return draw
+
+
+# Snake: bodies of growing length laid out in a straight line along a row
+SNAKE_LENGTHS = [{'length': 4}, {'length': 100}, {'length': 1000}]
+
+
+def long_snake(length):
+    return Snake([(length - i, 0) for i in range(length)])
+
+
+@benchmark('snake.Snake.move', SNAKE_LENGTHS)
+def bench_snake_move(length):
+    return long_snake(length).move
+
+
+@benchmark('snake.Snake.check_self_collision', SNAKE_LENGTHS)
+def bench_snake_self_collision(length):
+    return long_snake(length).check_self_collision
+
+
+@benchmark('snake.draw_game', SNAKE_LENGTHS)
+def bench_snake_draw(length):
+    engine = SnakeEngine(seed=1)
+    engine.snake = Snake([(i % 80, i // 80) for i in range(length)])
+    return lambda: snake.draw_game(engine)
+
+
+# Memory: board sizes from the first level up to the largest board that fits the window, which
+# reuses icons past the 64 boxes the default theme can fill
+MEMORY_SIZES = [{'width': 4, 'height': 4}, {'width': 6, 'height': 6}, {'width': 8, 'height': 8},
+                {'width': 16, 'height': 12}]
+
+
+def memory_board(width, height):
+    memory.setBoardSize(width, height)
+    return memory.getRandomizedBoard(random.Random(1))
+
+
+@benchmark('memory.getRandomizedBoard', MEMORY_SIZES)
+def bench_memory_board(width, height):
+    memory_board(width, height)
+    rng = random.Random(1)
+    return lambda: memory.getRandomizedBoard(rng)
+
+
+@benchmark('memory.getBoxAtPixel', MEMORY_SIZES)
+def bench_memory_box_at_pixel(width, height):
+    memory_board(width, height)
+    # A point that is not over any box, the worst case for the old scan of every box
+    return lambda: memory.getBoxAtPixel(0, 0)
+
+
+@benchmark('memory.checkWord', MEMORY_SIZES)
+def bench_memory_check_word(width, height):
+    board = memory_board(width, height)
+    matched = Counter(board.icons[iconId][0] for iconId in board.cells)  # Every pair matched
+    return lambda: memory.checkWord(matched, memory.bonusWord)
+
+
+@benchmark('memory.drawBoard', MEMORY_SIZES)
+def bench_memory_draw(width, height):
+    board = memory_board(width, height)
+    for boxx in range(0, width, 2):  # Half the boxes show their icon
+        for boxy in range(height):
+            board.reveal(boxx, boxy)
+    def draw():
+        memory.DISPLAYSURF.fill(memory.COLORS['black'])
+        memory.drawBoard(board, board.revealed)
+        memory.drawTimer(memory.gameTimeLimit)
+    return draw
+
+
+@benchmark('memory.updateBoxAnimations', MEMORY_SIZES)
+def bench_memory_box_animations(width, height):
+    board = memory_board(width, height)
+    memory.stopBoxAnimations()
+    memory.startGameAnimation(board)
+    memory.updateBoxAnimations(board, memory.STARTANIMATIONTIME // 2)  # Halfway through the opening
+    # One frame of the opening animation: every animated box is advanced and drawn
+    return lambda: memory.updateBoxAnimations(board, 0)
+
+
+# Hangman: a game halfway through, with some keys already colored
+@benchmark('hangman.draw', [{'guesses': 0}, {'guesses': 10}])
+def bench_hangman_draw(guesses):
+    hangman.word = 'KANGAROO'
+    hangman.guessed = {}
+    hangman.hangman_status = 0
+    hangman.init_keys()
+    for letter in hangman.LETTERS[:guesses]:
+        hangman.guessed[letter] = letter in hangman.word
+        hangman.update_keys(letter, hangman.guessed[letter])
+        hangman.hangman_status = min(6, hangman.hangman_status + (not hangman.guessed[letter]))
+    return lambda: hangman.draw("")
+
+
+# Hangman word files of random words, written and indexed once per size in a temporary folder
+# that run() removes when it is done
+_word_folder = None
+_word_files = {}
+
+
+def word_file_source(words):
+    global _word_folder
+    if _word_folder is None:
+        _word_folder = tempfile.TemporaryDirectory(prefix='arcade-words-')
+    if words not in _word_files:
+        path = os.path.join(_word_folder.name, f'benchmark-{words}.txt')
+        rng = random.Random(1)
+        with open(path, 'w', encoding='utf-8') as word_file:
+            for _ in range(words):
+                word_file.write(''.join(rng.choice(hangman.LETTERS) for _ in range(rng.randint(3, 14))) + '\n')
+        _word_files[words] = word_source.FileSource(path, hangman.LETTERS)
+        len(_word_files[words])  # Build the index before timing
+    return _word_files[words]
+
+
+@benchmark('hangman.word_source.sample', [{'words': 1000}, {'words': 100000}])
+def bench_word_sample(words):
+    source = word_file_source(words)
+    rng = random.Random(1)
+    return lambda: source.sample(rng, length=8, level='easy')
+
+
+def run(name_filter=None, repeat=REPEAT):
+    """Run every registered benchmark (optionally only names containing `name_filter`)."""
+    surface = pygame.display.set_mode((800, 600))
+    for module in (minesweeper, snake, memory, hangman):
+        module.init(surface)
+    fonts.warm_up()
+
+    saved_board = (memory.BOARDWIDTH, memory.BOARDHEIGHT)
+    results = []
+    try:
+        for name, cases, setup in BENCHMARKS:
+            if name_filter and name_filter not in name:
+                continue
+            for case in cases:
+                rounds, number = measure(setup, case, repeat)
+                results.append({
+                    'name': name,
+                    'params': case,
+                    'calls_per_round': number,
+                    'best_us': min(rounds) * 1e6,
+                    'median_us': statistics.median(rounds) * 1e6,
+                })
+                print(f"{name:36} {format_params(case):22} {results[-1]['best_us']:12.2f} us",
+                      file=sys.stderr)
+    finally:
+        memory.setBoardSize(*saved_board)
+        remove_word_files()
+    return {'meta': metadata(), 'results': results}
+
+
+def remove_word_files():
+    global _word_folder
+    _word_files.clear()  # Close the memory maps of the word files before deleting them
+    if _word_folder is not None:
+        _word_folder.cleanup()
+        _word_folder = None
+
+
+def format_params(params):
+    return ' '.join(f'{key}={value}' for key, value in params.items())
+
+
+def metadata():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+    }
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """Print the speed change of every case found in both runs; returns the number of regressions."""
+    def key(result):
+        return result['name'], json.dumps(result['params'], sort_keys=True)
+    before = {key(result): result for result in baseline['results']}
+    regressions = 0
+    for result in current['results']:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        ratio = result['best_us'] / old['best_us']
+        slower = ratio >= threshold
+        regressions += slower
+        print(f"{'SLOWER' if slower else '      '} {result['name']:36} {format_params(result['params']):22} "
+              f"{old['best_us']:12.2f} -> {result['best_us']:12.2f} us  x{ratio:.2f}", file=sys.stderr)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time the game-logic and rendering hot paths.')
+    parser.add_argument('-o', '--output', help='write the results to this JSON file instead of stdout')
+    parser.add_argument('-k', '--filter', help='only run benchmarks whose name contains this text')
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT, help='timed rounds per case')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='compare with an earlier results file; exits with 1 if anything got slower')
+    args = parser.parse_args()
+
+    pygame.init()
+    report = run(args.filter, args.repeat)
+    pygame.quit()
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            sys.exit(1 if compare(json.load(baseline_file), report) else 0)
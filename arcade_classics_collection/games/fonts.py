@@ -0,0 +1,39 @@
+# Process-wide font registry shared by all games and the launcher
+# Fonts are named by (name, size) specs: None is pygame's default font, names ending in .ttf
+# are font files, anything else is a system font. Each spec is resolved to a Font only once.
+import pygame
+
+_known = set()  # Every spec declared so far, resolved by warm_up()
+_paths = {}  # System font name -> font file (or None when not installed)
+_fonts = {}  # (name, size) -> pygame Font
+
+
+def font(name, size):
+    """Declare a font spec and return it; the Font itself is created on first use or warm_up()."""
+    spec = (name, size)
+    _known.add(spec)
+    return spec
+
+
+def get_font(spec):
+    """Return the pygame Font for a (name, size) spec, resolving it on first use."""
+    loaded = _fonts.get(spec)
+    if loaded is None:
+        name, size = spec
+        if name is not None and not name.endswith('.ttf'):
+            # Look the system font up once per name, not once per size like SysFont does
+            if name not in _paths:
+                _paths[name] = pygame.font.match_font(name)
+            name = _paths[name]  # None falls back to the default font, as SysFont would
+        loaded = pygame.font.Font(name, size)
+        _fonts[spec] = loaded
+        _known.add(spec)
+    return loaded
+
+
+def warm_up(specs=None):
+    """Resolve the given specs (every declared spec by default) so no lookup happens mid-frame."""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    for spec in list(_known if specs is None else specs):
+        get_font(spec)
@@ -4,18 +4,25 @@ import pygame
 import random
 import sys
 
-# Initialize Pygame
-pygame.init()
+from games import fonts, idle, layers, profiler, replay, text_cache, tween, word_source
 
-# Set up display
+# Set up display; the surface is set by init() so importing this module opens no window
 WIDTH, HEIGHT = 800, 600
-win = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Hangman Game!")
+win = None
 
-# Fonts and Colors
-LETTER_FONT = pygame.font.SysFont('times new roman', 30)
-WORD_FONT = pygame.font.SysFont('times new roman', 36)
-TITLE_FONT = pygame.font.SysFont('times new roman', 36)
+def init(surface=None):
+    global win
+    if surface is None:
+        # Initialize Pygame and open a window when the game runs on its own
+        pygame.init()
+        surface = pygame.display.set_mode((WIDTH, HEIGHT))
+    win = surface
+
+# Fonts as (name, size) specs for the shared text cache, and Colors
+LETTER_FONT = fonts.font('times new roman', 30)
+WORD_FONT = fonts.font('times new roman', 36)
+TITLE_FONT = fonts.font('times new roman', 36)
+BUTTON_FONT = fonts.font(None, 20)
 
 COLORS = {
     'white': (239, 235, 235),   # Define white, light grayish
@@ -25,14 +32,14 @@ COLORS = {
     'green': (143, 188, 143)  # Define light green, a muted sage green
 }
 
-# Game variables
+# Game variables; a theme's words come from words/<theme>.txt if there is one, else from these lists
 themes = {
     "Science": ["GRAVITY", "ATOM", "ENERGY", "QUANTUM", "NEURON"],
     "Sports": ["FOOTBALL", "BASKETBALL", "CRICKET", "TENNIS", "BASEBALL"],
     "Geography": ["MOUNTAIN", "RIVER", "COUNTRY", "CITY", "OCEAN"],
     "Animals": ["ELEPHANT", "GIRAFFE", "RHINOCEROS", "KANGAROO", "TIGER"]
 }
-words = []
+words = None  # Word source of the selected theme
 word = ''
 guessed = {}
 hangman_status = 0
@@ -44,35 +51,52 @@ keys = [
     "YXCVBNM"
 ]
 key_positions = []
+key_rows = []  # (left x, top y, letters) of each keyboard row, for finding the key under the mouse
+KEY_WIDTH = 40
+KEY_HEIGHT = 40
+KEY_SPACING = 10
+KEYBOARD_Y = 400
+LETTERS = "".join(keys)  # Guesses are stored in recordings by their index in this string
+GAME_QUIT, GAME_LOST, GAME_WON = 0, 1, 2  # How a game ended, stored in recordings
 
 def init_keys():
     global key_positions
     key_positions.clear()
-    key_width = 40
-    key_height = 40
-    key_spacing = 10
-    starting_y = 400
+    key_rows.clear()
+    background.invalidate()
     for index, row in enumerate(keys):
-        total_row_width = len(row) * (key_width + key_spacing) - key_spacing
+        total_row_width = len(row) * (KEY_WIDTH + KEY_SPACING) - KEY_SPACING
         starting_x = (WIDTH - total_row_width) // 2
+        y = KEYBOARD_Y + index * (KEY_HEIGHT + KEY_SPACING)
+        key_rows.append((starting_x, y, row))
         for i, letter in enumerate(row):
-            x = starting_x + i * (key_width + key_spacing)
-            y = starting_y + index * (key_height + 10)
-            key_positions.append((letter, x, y, key_width, key_height, COLORS['white']))
+            x = starting_x + i * (KEY_WIDTH + KEY_SPACING)
+            key_positions.append((letter, x, y, KEY_WIDTH, KEY_HEIGHT, COLORS['white']))
+
+def key_at(x, y):
+    # Keys are evenly spaced in their row, so the key under a point is computed instead of searched;
+    # like the key rectangles, the check includes the right and bottom edges. Returns None between keys.
+    row, offsety = divmod(y - KEYBOARD_Y, KEY_HEIGHT + KEY_SPACING)
+    if not 0 <= row < len(key_rows) or offsety > KEY_HEIGHT:
+        return None
+    starting_x, _, letters = key_rows[row]
+    column, offsetx = divmod(x - starting_x, KEY_WIDTH + KEY_SPACING)
+    if not 0 <= column < len(letters) or offsetx > KEY_WIDTH:
+        return None
+    return letters[column]
 
-def draw_keys():
+def draw_keys(surface):
     for letter, x, y, width, height, color in key_positions:
-        pygame.draw.rect(win, color, (x, y, width, height))
-        text = LETTER_FONT.render(letter, True, COLORS['black'])
-        win.blit(text, (x + (width - text.get_width()) // 2, y + (height - text.get_height()) // 2))
+        pygame.draw.rect(surface, color, (x, y, width, height))
+        text = text_cache.render(LETTER_FONT, letter, COLORS['black'])
+        surface.blit(text, (x + (width - text.get_width()) // 2, y + (height - text.get_height()) // 2))
 
-def drawMainMenuButton(mainMenuButton):
-    pygame.draw.rect(win, COLORS['grey'], mainMenuButton)  # Draw the button
-    buttonFont = pygame.font.Font(None, 20)
-    buttonText = buttonFont.render('Main Menu', True, COLORS['white'])
+def drawMainMenuButton(surface, mainMenuButton):
+    pygame.draw.rect(surface, COLORS['grey'], mainMenuButton)  # Draw the button
+    buttonText = text_cache.render(BUTTON_FONT, 'Main Menu', COLORS['white'])
     buttonTextRect = buttonText.get_rect()
     buttonTextRect.center = mainMenuButton.center
-    win.blit(buttonText, buttonTextRect)
+    surface.blit(buttonText, buttonTextRect)
 
 def draw_hangman():
     stages = [
@@ -90,29 +114,36 @@ def update_keys(guess, correct):
     for i, (letter, x, y, width, height, color) in enumerate(key_positions):
         if letter == guess:
             key_positions[i] = (letter, x, y, width, height, COLORS['green'] if correct else COLORS['red'])
+    background.invalidate()  # Redraw the keyboard with the key's new color
+
+# Title, keyboard and main menu button only change when a key changes color, so they are drawn
+# once into a cached layer; each frame blits the layer and draws the word and the hangman on top
+def draw_background(surface):
+    surface.fill(COLORS['black'])
+    text = text_cache.render(TITLE_FONT, "HANGMAN", COLORS['white'])
+    surface.blit(text, (WIDTH / 2 - text.get_width() / 2, 20))
+    mainMenuButton = pygame.Rect(WIDTH - 140, 10, 130, 30)  # Define button dimensions and position
+    with profiler.get('hangman').section('draw_keys'):
+        draw_keys(surface)
+    drawMainMenuButton(surface, mainMenuButton)
+
+background = layers.Layer((WIDTH, HEIGHT), draw_background)
 
 def draw(current_guess):
-    win.fill(COLORS['black'])
-    text = TITLE_FONT.render("HANGMAN", 1, COLORS['white'])
-    win.blit(text, (WIDTH / 2 - text.get_width() / 2, 20))
+    background.draw(win)
     display_word = " ".join([letter if letter in guessed else '_' for letter in word])
-    text = WORD_FONT.render(display_word, 1, COLORS['white'])
+    text = text_cache.render(WORD_FONT, display_word, COLORS['white'])
     win.blit(text, (WIDTH / 2 - text.get_width() / 2, 200))
-    mainMenuButton = pygame.Rect(WIDTH - 140, 10, 130, 30)  # Define button dimensions and position
-    draw_keys()
     draw_hangman()
-    drawMainMenuButton(mainMenuButton)
-    pygame.display.update()
 
 def message_display(message):
     win.fill(COLORS['black'])  # Clear screen before displaying the message
-    text = WORD_FONT.render(message, 1, COLORS['white'])
+    text = text_cache.render(WORD_FONT, message, COLORS['white'])
     win.blit(text, (WIDTH / 2 - text.get_width() / 2, HEIGHT / 2 - text.get_height() / 2))
     pygame.display.update()
-    pygame.time.delay(2000)
 
-def end_game_message(message):
-    message_display(message)
+def end_game_message(message):  # Show the message for two seconds; returns the timeline for the game loop to play
+    return tween.Timeline().call(lambda: message_display(message)).wait(2000)
 
 def draw_theme_buttons():
     global theme_buttons
@@ -124,18 +155,21 @@ def draw_theme_buttons():
     ]
     for theme, x, y, width, height, color in theme_buttons:
         pygame.draw.rect(win, color, (x, y, width, height))
-        text = LETTER_FONT.render(theme, True, COLORS['black'])
+        text = text_cache.render(LETTER_FONT, theme, COLORS['black'])
         win.blit(text, (x + (width - text.get_width()) // 2, y + (height - text.get_height()) // 2))
 
 def theme_selection():
-    win.fill(COLORS['black'])
-    text = TITLE_FONT.render("Please select theme for your words", True, COLORS['white'])
-    win.blit(text, (WIDTH // 2 - text.get_width() // 2, 150))
-    draw_theme_buttons()
-    pygame.display.update()
+    scheduler = idle.IdleScheduler(30)  # Nothing moves on this screen, so it sleeps until input arrives
     choosing = True
     while choosing:
-        for event in pygame.event.get():
+        events = scheduler.poll()
+        if scheduler.dirty:
+            win.fill(COLORS['black'])
+            text = text_cache.render(TITLE_FONT, "Please select theme for your words", COLORS['white'])
+            win.blit(text, (WIDTH // 2 - text.get_width() // 2, 150))
+            draw_theme_buttons()
+            pygame.display.update()
+        for event in events:
             if event.type == pygame.MOUSEBUTTONDOWN:
                 x, y = event.pos
                 for theme, tx, ty, twidth, theight, _ in theme_buttons:
@@ -145,52 +179,125 @@ def theme_selection():
                 pygame.quit()
                 sys.exit()
 
+def play_guess(word, guessed, status, letter):
+    # One guess by the rules of the game, shared by main() and simulate(): records the new letter in
+    # guessed and returns (wrong guesses, outcome); the outcome is None until the game is won or lost
+    guessed[letter] = letter in word
+    if not guessed[letter]:
+        status += 1
+    if status == 6:
+        return status, GAME_LOST
+    elif all(letter in guessed for letter in word):
+        return status, GAME_WON
+    return status, None
+
 def main():
     global words, word, guessed, hangman_status
+    pygame.display.set_caption("Hangman Game!")
+    recording = replay.Recording('hangman')  # Seed and inputs, so the game can be replayed headless
+    rng = random.Random(recording.seed)
     selected_theme = theme_selection()
-    words = themes[selected_theme]
-    word = random.choice(words).upper()
+    recording.record(0, replay.THEME, list(themes).index(selected_theme))
+    words = word_source.get(selected_theme, themes[selected_theme], LETTERS)
+    word = words.sample(rng)
     guessed = {}
     hangman_status = 0
     mainMenuButton = pygame.Rect(WIDTH - 140, 10, 130, 30)  # Define button dimensions and position
     init_keys()
     run = True
-    clock = pygame.time.Clock()
+    scheduler = idle.IdleScheduler(30)  # The screen only changes after a click, so idle frames sleep
+    tick = 0  # Frames since the start, used to timestamp recorded inputs
+    result = None
+    stats = profiler.get('hangman')  # Frame timings, overlay on F3
+    ending = None  # End message, played once the result is known
 
     while run:
-        clock.tick(30)
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                x, y = event.pos
-                for letter, kx, ky, kwidth, kheight, kcolor in key_positions:
-                    if kx <= x <= kx + kwidth and ky <= y <= ky + kheight:
-                        if letter not in guessed:
-                            guessed[letter] = letter in word
-                            update_keys(letter, guessed[letter])
-                            if not guessed[letter]:
-                                hangman_status += 1
-                            if hangman_status == 6:
-                                end_game_message(f"You LOST! Word was: {word}")
-                                run = False
-                            elif all(letter in guessed for letter in word):
-                                end_game_message("You WON! Congrats!")
-                                run = False
-                            break
-                    if mainMenuButton.collidepoint(x, y):
-                        hangman_status == 6
-                        end_game_message(f"You LOST! Word was: {word}")
-                        run = False
-                        break
-
-        if run:
-            draw("")
+        stats.begin_frame()
+        scheduler.animating = ending is not None or stats.overlay_visible  # The end message and the overlay keep moving
+        events = scheduler.poll()
+        if ending is not None:
+            # The result is decided; the message stays up while events are still handled
+            ending.update(scheduler.clock.get_time())
+            if any(event.type == pygame.QUIT for event in events):
+                pygame.event.post(pygame.event.Event(pygame.QUIT))  # Close the window once the game is saved
+                run = False
+            elif ending.done:
+                run = False
+            continue
+        tick += 1
+        clicks = []  # Positions clicked this frame, played in order by the update step
+        with stats.section('events'):
+            for event in events:
+                stats.handle_event(event)
+                if event.type == pygame.QUIT:
+                    stats.dump()
+                    pygame.quit()
+                    sys.exit()
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    clicks.append(event.pos)
+
+        with stats.section('update'):
+            for x, y in clicks:
+                letter = key_at(x, y)
+                if letter is not None:
+                    if letter not in guessed:
+                        recording.record(tick, replay.GUESS, LETTERS.index(letter))
+                        hangman_status, outcome = play_guess(word, guessed, hangman_status, letter)
+                        update_keys(letter, guessed[letter])
+                        if outcome is not None:
+                            result = (outcome, hangman_status, len(guessed))
+                            ending = end_game_message(f"You LOST! Word was: {word}" if outcome == GAME_LOST
+                                                      else "You WON! Congrats!")
+                elif mainMenuButton.collidepoint(x, y):
+                    recording.record(tick, replay.MENU)
+                    result = (GAME_QUIT, hangman_status, len(guessed))
+                    ending = end_game_message(f"You LOST! Word was: {word}")
+                if ending is not None:
+                    break  # The game is over; later clicks in this frame are ignored
+
+        if ending is None and scheduler.dirty:
+            with stats.section('draw'):
+                draw("")
+                stats.draw_overlay(win)
+            with stats.section('present'):
+                pygame.display.update()
+            stats.end_frame(scheduler.clock)
+
+    recording.finish(*result)
+    replay.save(recording)
+    stats.dump()
+
+def simulate(recording):
+    # Replay a recorded game without a display, returning (outcome, wrong guesses, letters guessed)
+    rng = random.Random(recording.seed)
+    word = ''
+    guessed = {}
+    status = 0
+    for tick, code, values in recording.inputs:
+        if code == replay.THEME:
+            if len(values) != 1 or not 0 <= values[0] < len(themes):
+                raise replay.illegal(tick, code, values)
+            theme = list(themes)[values[0]]
+            word = word_source.get(theme, themes[theme], LETTERS).sample(rng)
+        elif code == replay.GUESS:
+            # The live game records a guess only once per letter, and only after the theme is chosen
+            if not word or len(values) != 1 or not 0 <= values[0] < len(LETTERS) or LETTERS[values[0]] in guessed:
+                raise replay.illegal(tick, code, values)
+            status, outcome = play_guess(word, guessed, status, LETTERS[values[0]])
+            if outcome is not None:
+                return outcome, status, len(guessed)
+        elif code == replay.MENU:
+            break
+        else:
+            raise replay.illegal(tick, code, values)
+    return GAME_QUIT, status, len(guessed)
 
 # Define run_game_[game] for arcade interface.
 def run_game_hangman():
     print("Starting Hangman Game...")
+    if win is None:
+        init()
+    fonts.warm_up()  # Resolve fonts before the first frame
     main()  # Start the Game
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+# Frame pacing that sleeps on input while nothing moves
+# Menus and turn-based games only change when the player does something, so while nothing animates
+# the loop blocks in pygame.event.wait() instead of redrawing an unchanged screen at full frame rate.
+# Loops that animate, or that were asked to redraw, are paced at their normal frame rate.
+import pygame
+
+IDLE_TIMEOUT = 1000  # Longest wait for input in milliseconds, so idle loops still wake up now and then
+
+
+class IdleScheduler:
+    """Hands a loop the events of each frame and tells it whether the frame needs drawing."""
+    def __init__(self, fps, clock=None, timeout=IDLE_TIMEOUT):
+        self.fps = fps
+        self.clock = clock or pygame.time.Clock()
+        self.timeout = timeout
+        self.animating = False  # Set while something moves on screen; frames are then paced at fps
+        self.pending = True  # A redraw was requested; the first frame is always drawn
+        self.dirty = False  # Whether the current frame should be drawn
+
+    def request_frame(self):
+        """Draw the next frame even if no input arrives, e.g. after switching screens."""
+        self.pending = True
+
+    def poll(self):
+        """Wait for the next frame and return its events; `dirty` says whether to draw it."""
+        if self.animating or self.pending:
+            self.clock.tick(self.fps)
+            events = pygame.event.get()
+        else:
+            event = pygame.event.wait(self.timeout)
+            self.clock.tick()  # Only measures the frame; the wait already slept
+            events = [] if event.type == pygame.NOEVENT else [event] + pygame.event.get()
+        self.dirty = self.animating or self.pending or bool(events)
+        self.pending = False
+        return events
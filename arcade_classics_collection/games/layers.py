@@ -0,0 +1,27 @@
+# Cached layers of static screen content for the games and the launcher
+# A layer draws content that rarely changes (backgrounds, titles, buttons) once onto an offscreen
+# surface; each frame then costs a single blit, and the dynamic parts are drawn on top of it.
+import pygame
+
+
+class Layer:
+    """Offscreen copy of whatever `render(surface)` draws, redrawn only after invalidate()."""
+    def __init__(self, size, render):
+        self.size = size
+        self.render = render
+        self.surface = None  # Created on first use, so declaring a layer opens no window
+
+    def invalidate(self):
+        """Mark the content as changed; it is rendered again the next time it is drawn."""
+        self.surface = None
+
+    def get(self):
+        if self.surface is None:
+            self.surface = pygame.Surface(self.size)
+            if pygame.display.get_surface() is not None:
+                self.surface = self.surface.convert()  # Same pixel format as the screen, for fast blits
+            self.render(self.surface)
+        return self.surface
+
+    def draw(self, target, position=(0, 0)):
+        target.blit(self.get(), position)
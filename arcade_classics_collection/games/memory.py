@@ -1,22 +1,35 @@
 import random
 import pygame
 import sys
+from collections import Counter
 from pygame.locals import *
 
+from games import fonts, idle, profiler, replay, text_cache, tween
+from games.memory_board import MemoryBoard
+
 FPS = 30
 WINDOWWIDTH = 800
 WINDOWHEIGHT = 600
-REVEALSPEED = 8
+REVEALSPEED = 8  # Pixels of a box cover slid per frame
 BOXSIZE = 40
 GAPSIZE = 10
 BOARDWIDTH = 5
 BOARDHEIGHT = 4
+MAXBOARDWIDTH = 10  # Boards stop growing here; larger boards work too, reusing icons once a theme runs out
+MAXBOARDHEIGHT = 10
 
 assert (BOARDWIDTH * BOARDHEIGHT) % 2 == 0, 'Board must have an even number of boxes for pairs of matches.'
 
 XMARGIN = int((WINDOWWIDTH - (BOARDWIDTH * (BOXSIZE + GAPSIZE))) / 2)
 YMARGIN = int((WINDOWHEIGHT - (BOARDHEIGHT * (BOXSIZE + GAPSIZE))) / 2)
 
+# Fonts as (name, size) specs for the shared text cache
+ICONFONT = fonts.font('freesansbold.ttf', 20)
+TIMERFONT = fonts.font(None, 36)
+BUTTONFONT = fonts.font(None, 20)
+MESSAGEFONT = fonts.font(None, 48)
+MENUFONT = fonts.font(None, 36)
+
 # Colors
 COLORS = {
     'white': (239, 235, 235),   # Define white, light grayish
@@ -44,122 +57,143 @@ def selectTheme(theme):
 # Initialize the theme
 currentTheme = 'default'
 selectTheme(currentTheme)
-assert len(ALLCOLORS) * len(ALLLETTERS) * 2 >= BOARDWIDTH * BOARDHEIGHT, "Board is too big for the number of shapes/colors defined."
 
-# Time settings
+# Time settings; game time is counted in frames of the main loop so recorded games replay exactly
 gameTimeLimit = 180000  # 3 minutes in milliseconds
 bonusTime = 40000  # 40 seconds bonus time
+GAME_QUIT, GAME_LOST = 0, 1  # How a game ended, stored in recordings
+
+def elapsedTime(tick, startTick):
+    return (tick - startTick) * 1000 // FPS  # Milliseconds of game time between two frames
+
+# The board is drawn onto a cached surface that keeps every box as it was last drawn; a frame redraws
+# only the boxes whose revealed state changed and then blits the whole board at once. The surface and
+# the icon sprites are transparent where the window shows through, like the boxes drawn directly.
+BOARDKEY = (255, 0, 255)  # Transparent color of the board surface and the icon sprites
+iconSprites = {}  # (letter, color) -> box-sized sprite with the letter centered
+boardCache = None  # (board, surface, bitset of the boxes drawn revealed on the surface)
+
+def getIconSprite(icon):
+    if icon not in iconSprites:
+        letter, color = icon
+        sprite = pygame.Surface((BOXSIZE, BOXSIZE))
+        sprite.fill(BOARDKEY)
+        text = text_cache.render(ICONFONT, letter, color, COLORS['black'])
+        sprite.blit(text, text.get_rect(center=(BOXSIZE // 2, BOXSIZE // 2)))
+        sprite.set_colorkey(BOARDKEY)
+        iconSprites[icon] = sprite
+    return iconSprites[icon]
 
 def drawBoard(board, revealed):
-    for boxx in range(BOARDWIDTH):
-        for boxy in range(BOARDHEIGHT):
-            left, top = leftTopCoordsOfBox(boxx, boxy)
-            if not revealed[boxx][boxy]:
-                pygame.draw.rect(DISPLAYSURF, COLORS['white'], (left, top, BOXSIZE, BOXSIZE))
-            else:
-                letter, color = getLetterAndColor(board, boxx, boxy)
-                drawIcon(letter, color, boxx, boxy)
-def getRandomizedBoard():
+    # `revealed` is a bitset like board.revealed, so animations can draw the board all covered or all shown
+    global boardCache
+    if boardCache is None or boardCache[0] is not board:
+        for icon in board.icons:
+            getIconSprite(icon)
+        surface = pygame.Surface((board.width * (BOXSIZE + GAPSIZE) - GAPSIZE, board.height * (BOXSIZE + GAPSIZE) - GAPSIZE))
+        surface.fill(BOARDKEY)
+        surface.set_colorkey(BOARDKEY)
+        boardCache = (board, surface, ~revealed)  # Every box counts as changed
+    board, surface, drawn = boardCache
+    changed = (drawn ^ revealed) & board.allBoxes()
+    while changed:
+        bit = changed & -changed  # Lowest changed box
+        changed ^= bit
+        boxx, boxy = divmod(bit.bit_length() - 1, board.height)
+        box = (boxx * (BOXSIZE + GAPSIZE), boxy * (BOXSIZE + GAPSIZE), BOXSIZE, BOXSIZE)
+        if revealed & bit:
+            surface.fill(BOARDKEY, box)
+            surface.blit(iconSprites[board.icon(boxx, boxy)], box)
+        else:
+            surface.fill(COLORS['white'], box)
+    boardCache = (board, surface, revealed)
+    DISPLAYSURF.blit(surface, (XMARGIN, YMARGIN))
+
+def getRandomizedBoard(rng=random):
     icons = [(letter, color) for color in ALLCOLORS for letter in ALLLETTERS]
-    random.shuffle(icons)
-    numIconsUsed = int(BOARDWIDTH * BOARDHEIGHT / 2)
-    icons = icons[:numIconsUsed] * 2
-    random.shuffle(icons)
-
-    board = []
-    for x in range(BOARDWIDTH):
-        column = []
-        for y in range(BOARDHEIGHT):
-            column.append(icons.pop(0))
-        board.append(column)
-    return board
+    return MemoryBoard(BOARDWIDTH, BOARDHEIGHT, icons, rng)
 
 def getLetterAndColor(board, boxx, boxy):
-    return board[boxx][boxy]
+    return board.icon(boxx, boxy)
 
 def drawIcon(letter, color, boxx, boxy):
-    half = BOXSIZE // 2
-    left, top = leftTopCoordsOfBox(boxx, boxy)
-    font = pygame.font.Font('freesansbold.ttf', 20)
-    text = font.render(letter, True, color, COLORS['black'])
-    textRect = text.get_rect()
-    textRect.center = (left + half, top + half)
-    DISPLAYSURF.blit(text, textRect)
+    DISPLAYSURF.blit(getIconSprite((letter, color)), leftTopCoordsOfBox(boxx, boxy))
 
-def checkWord(board, revealed, word):
-    foundWord = ''.join(board[x][y][0] for x in range(BOARDWIDTH) for y in range(BOARDHEIGHT) if revealed[x][y])
-    return word in foundWord
+def checkWord(matchedLetters, word):
+    # The bonus counts once the matched boxes hold every letter of the word, in any order and place on
+    # the board; matchedLetters counts the letters of matched pairs, so this looks at the word only.
+    # Once true it stays true for the board, so the game gives the bonus only the first time.
+    return all(matchedLetters[letter] >= count for letter, count in Counter(word).items())
 
 def drawTimer(timeRemaining):
     mins, secs = divmod(timeRemaining // 1000, 60)
     timeText = f'Time remaining: {mins:02}:{secs:02}'
-    font = pygame.font.Font(None, 36)
-    text = font.render(timeText, True, COLORS['white'])
+    text = text_cache.render(TIMERFONT, timeText, COLORS['white'])
     textRect = text.get_rect()
     textRect.topleft = (10, 10)
     DISPLAYSURF.blit(text, textRect)
 
 def drawMainMenuButton(mainMenuButton):
     pygame.draw.rect(DISPLAYSURF, COLORS['grey'], mainMenuButton)  # Draw the button
-    buttonFont = pygame.font.Font(None, 20)
-    buttonText = buttonFont.render('Main Menu', True, COLORS['white'])
+    buttonText = text_cache.render(BUTTONFONT, 'Main Menu', COLORS['white'])
     buttonTextRect = buttonText.get_rect()
     buttonTextRect.center = mainMenuButton.center
     DISPLAYSURF.blit(buttonText, buttonTextRect)
 
-def gameOverAnimation():
-    font = pygame.font.Font(None, 48)
-    text = font.render("Time's up!", True, COLORS['red'])
+# The animations below return timelines that the game loop plays one frame at a time
+def drawMessage(message):
+    text = text_cache.render(MESSAGEFONT, message, COLORS['red'])
     textRect = text.get_rect()
     textRect.center = (WINDOWWIDTH // 2, WINDOWHEIGHT // 4)
     DISPLAYSURF.blit(text, textRect)
-    pygame.display.update()
-    pygame.time.wait(2000)
 
-def gameOverAnimationMainMenu():
-    font = pygame.font.Font(None, 48)
-    text = font.render("Game Over!", True, COLORS['red'])
-    textRect = text.get_rect()
-    textRect.center = (WINDOWWIDTH // 2, WINDOWHEIGHT // 4)
-    DISPLAYSURF.blit(text, textRect)
-    pygame.display.update()
-    pygame.time.wait(2000)
+def gameOverAnimation():
+    return tween.Timeline().call(lambda: drawMessage("Time's up!")).wait(2000)
 
-def generateRevealedBoxesData(val):
-    return [[val] * BOARDHEIGHT for _ in range(BOARDWIDTH)]
+def gameOverAnimationMainMenu():
+    return tween.Timeline().call(lambda: drawMessage("Game Over!")).wait(2000)
 
 def startGameAnimation(board):
-    coveredBoxes = generateRevealedBoxesData(False)
-    boxes = [(x, y) for x in range(BOARDWIDTH) for y in range(BOARDHEIGHT)]
+    # Groups of 8 boxes show their icons one after another. On big boards the groups start closer
+    # together and overlap, so the whole animation never takes longer than STARTANIMATIONTIME.
+    boxes = [(x, y) for x in range(board.width) for y in range(board.height)]
     random.shuffle(boxes)
     boxGroups = splitIntoGroupsOf(8, boxes)
-    drawBoard(board, coveredBoxes)
-    for boxGroup in boxGroups:
-        revealBoxesAnimation(board, boxGroup)
-        coverBoxesAnimation(board, boxGroup)
+    groupTime = 2 * REVEALTIME
+    spacing = groupTime
+    if len(boxGroups) > 1:
+        spacing = min(groupTime, (STARTANIMATIONTIME - groupTime) // (len(boxGroups) - 1))
+    for i, boxGroup in enumerate(boxGroups):
+        for box in boxGroup:
+            animateBox(box, (i * spacing, BOXSIZE, BOXSIZE), (REVEALTIME, BOXSIZE, 0), (REVEALTIME, 0, BOXSIZE))
 
 def gameWonAnimation(board):
-    coveredBoxes = generateRevealedBoxesData(True)
-    color1 = COLORS['grey']
-    color2 = COLORS['black']
-    for _ in range(13):
-        color1, color2 = color2, color1
-        DISPLAYSURF.fill(color1)
-        drawBoard(board, coveredBoxes)
-        pygame.display.update()
-        pygame.time.wait(300)
-
-def hasWon(revealedBoxes):
-    return all(all(row) for row in revealedBoxes)
+    def flash(progress):  # The background swaps between grey and black every 300 ms, 13 times
+        DISPLAYSURF.fill(COLORS['black'] if min(int(progress * 13), 12) % 2 else COLORS['grey'])
+        drawBoard(board, board.allBoxes())
+    return tween.Timeline().then(13 * 300, update=flash)
 
 def celebrationAnimation():
     colors = [COLORS['red'], COLORS['green'], COLORS['blue'], COLORS['yellow']]
-    for _ in range(60):
+    circles = []
+    shown = [None]  # Number of the burst on screen
+    def burst(progress):  # 60 bursts of circles, one every 50 ms; the last one stays for two more seconds
+        number = min(int(progress * 100), 59)
+        if number != shown[0]:
+            shown[0] = number
+            circles[:] = [(random.choice(colors), (random.randint(0, WINDOWWIDTH), random.randint(0, WINDOWHEIGHT)), random.randint(10, 40))
+                          for _ in range(20)]
         DISPLAYSURF.fill(COLORS['black'])
-        for _ in range(20):
-            pygame.draw.circle(DISPLAYSURF, random.choice(colors), (random.randint(0, WINDOWWIDTH), random.randint(0, WINDOWHEIGHT)), random.randint(10, 40))
-        pygame.display.update()
-        pygame.time.wait(50)
+        for color, center, radius in circles:
+            pygame.draw.circle(DISPLAYSURF, color, center, radius)
+    return tween.Timeline().then(CELEBRATIONTIME, update=burst)
+
+def mismatchAnimation(firstBox, secondBox):
+    # The second box opens, then both stay visible for a second and close again, even though the game
+    # already counts them as covered. The returned timeline lasts as long, so box clicks wait for it.
+    animateBox(secondBox, (REVEALTIME, BOXSIZE, 0), (1000, 0, 0), (REVEALTIME, 0, BOXSIZE))
+    animateBox(firstBox, (REVEALTIME + 1000, 0, 0), (REVEALTIME, 0, BOXSIZE))
+    return tween.Timeline().wait(2 * REVEALTIME + 1000)
 
 def splitIntoGroupsOf(groupSize, theList):
     return [theList[i:i + groupSize] for i in range(0, len(theList), groupSize)]
@@ -173,9 +207,43 @@ def leftTopCoordsOfBox(boxx, boxy):
     top = boxy * (BOXSIZE + GAPSIZE) + YMARGIN
     return (left, top)
 
-def revealBoxesAnimation(board, boxesToReveal):
-    for coverage in range(BOXSIZE, -REVEALSPEED - 1, -REVEALSPEED):
-        drawBoxCovers(board, boxesToReveal, coverage)
+# Box animations slide the white cover of a box open or closed. Every animated box has its own
+# timeline, and updateBoxAnimations() advances all of them together once per frame of the game loop,
+# redrawing only the animated boxes over the board.
+REVEALTIME = 1000 * BOXSIZE // (REVEALSPEED * FPS)  # Milliseconds to open or close a cover
+STARTANIMATIONTIME = 3000  # Longest opening animation, whatever the board size
+CELEBRATIONTIME = 100 * 50  # Milliseconds of bursts after a cleared board, kept off the next level's timer
+boxCovers = {}  # (boxx, boxy) -> width of the cover drawn over an animated box; 0 shows the whole icon
+boxTimelines = {}  # (boxx, boxy) -> timeline moving that cover; a new animation replaces the box's old one
+
+def animateBox(box, *moves):
+    # Each move is (milliseconds, cover width at the start, cover width at the end)
+    def slide(start, end):
+        def update(progress):
+            boxCovers[box] = round(start + (end - start) * progress)
+        return update
+    timeline = tween.Timeline()
+    for duration, start, end in moves:
+        timeline.then(duration, update=slide(start, end))
+    boxCovers[box] = moves[0][1]
+    boxTimelines[box] = timeline
+
+def revealBoxesAnimation(boxesToReveal):
+    for box in boxesToReveal:
+        animateBox(box, (REVEALTIME, BOXSIZE, 0))
+
+def updateBoxAnimations(board, dt):
+    for box, timeline in list(boxTimelines.items()):
+        timeline.update(dt)
+        if timeline.done:  # The board shows the box as it ends up
+            del boxTimelines[box], boxCovers[box]
+    for box, coverage in boxCovers.items():
+        if coverage < BOXSIZE or board.isRevealed(*box):  # Fully covered boxes are on the board already
+            drawBoxCovers(board, [box], coverage)
+
+def stopBoxAnimations():
+    boxTimelines.clear()
+    boxCovers.clear()
 
 def drawBoxCovers(board, boxes, coverage):
     for box in boxes:
@@ -185,141 +253,271 @@ def drawBoxCovers(board, boxes, coverage):
         drawIcon(letter, color, box[0], box[1])
         if coverage > 0:
             pygame.draw.rect(DISPLAYSURF, COLORS['white'], (left, top, coverage, BOXSIZE))
-    pygame.display.update()
-    FPSCLOCK.tick(FPS)
-
-def coverBoxesAnimation(board, boxesToCover):
-    for coverage in range(0, BOXSIZE + REVEALSPEED, REVEALSPEED):
-        drawBoxCovers(board, boxesToCover, coverage)
 
 def getBoxAtPixel(x, y):
-    for boxx in range(BOARDWIDTH):
-        for boxy in range(BOARDHEIGHT):
-            left, top = leftTopCoordsOfBox(boxx, boxy)
-            boxRect = pygame.Rect(left, top, BOXSIZE, BOXSIZE)
-            if boxRect.collidepoint(x, y):
-                return (boxx, boxy)
+    # Boxes sit on a regular grid, so the box under a pixel is found with arithmetic instead of a scan;
+    # the remainder tells whether the pixel is on the box or in the gap after it
+    boxx, offsetx = divmod(x - XMARGIN, BOXSIZE + GAPSIZE)
+    boxy, offsety = divmod(y - YMARGIN, BOXSIZE + GAPSIZE)
+    if 0 <= boxx < BOARDWIDTH and 0 <= boxy < BOARDHEIGHT and offsetx < BOXSIZE and offsety < BOXSIZE:
+        return (boxx, boxy)
     return (None, None)
 
+def setBoardSize(width, height):
+    global BOARDWIDTH, BOARDHEIGHT, XMARGIN, YMARGIN
+    BOARDWIDTH = width
+    BOARDHEIGHT = height
+    XMARGIN = int((WINDOWWIDTH - (BOARDWIDTH * (BOXSIZE + GAPSIZE))) / 2)
+    YMARGIN = int((WINDOWHEIGHT - (BOARDHEIGHT * (BOXSIZE + GAPSIZE))) / 2)
+
 def increaseBoardSize():
-    global BOARDWIDTH, BOARDHEIGHT, XMARGIN, YMARGIN, gameTimeLimit
-    if BOARDWIDTH < 10 and BOARDHEIGHT < 10:  # Max size limit
-        BOARDWIDTH += 1
-        BOARDHEIGHT += 1
-        XMARGIN = int((WINDOWWIDTH - (BOARDWIDTH * (BOXSIZE + GAPSIZE))) / 2)
-        YMARGIN = int((WINDOWHEIGHT - (BOARDHEIGHT * (BOXSIZE + GAPSIZE))) / 2)
+    global gameTimeLimit
+    if BOARDWIDTH < MAXBOARDWIDTH and BOARDHEIGHT < MAXBOARDHEIGHT:
+        setBoardSize(BOARDWIDTH + 1, BOARDHEIGHT + 1)
         gameTimeLimit += 60000  # Add 1 minute for each level
 
-def main():
-    global FPSCLOCK, DISPLAYSURF, startTime, timeRemaining
-    pygame.init()
+# Display surface and clock, set by init() so importing this module opens no window
+DISPLAYSURF = None
+FPSCLOCK = None
+
+def init(surface=None):
+    global FPSCLOCK, DISPLAYSURF
+    if surface is None:
+        # Open a window when the game runs on its own
+        pygame.init()
+        surface = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
+    DISPLAYSURF = surface
     FPSCLOCK = pygame.time.Clock()
-    DISPLAYSURF = pygame.display.set_mode((WINDOWWIDTH, WINDOWHEIGHT))
+
+# Rules of a game, without drawing: main() and simulate() both play clicks through this, so a
+# replay follows exactly the same turns, bonus and level changes as the live game
+FIRST, MISMATCH, MATCH, CLEARED = range(4)  # What a click did, for the game loop to animate
+
+class MemoryGame:
+    def __init__(self, rng):
+        self.rng = rng
+        self.board = getRandomizedBoard(rng)
+        self.matchedLetters = Counter()  # Letters of the matched boxes, for the bonus word
+        self.bonusGranted = False  # The bonus time is given once per board
+        self.firstSelection = None
+        self.startTick = 0  # Tick the timer counts from; bonuses move it forward
+        self.levelsCleared = 0
+
+    def timeRemaining(self, tick):
+        return max(gameTimeLimit - elapsedTime(tick, self.startTick), 0)
+
+    def click(self, boxx, boxy, tick):
+        # Reveal a covered box; the second box of a turn is matched against the first. Returns FIRST,
+        # MISMATCH (both boxes are covered again), MATCH or CLEARED (the next, larger board is dealt),
+        # or None when the box is off the board or already showing, as such clicks do nothing
+        if not (0 <= boxx < self.board.width and 0 <= boxy < self.board.height) or self.board.isRevealed(boxx, boxy):
+            return None
+        self.board.reveal(boxx, boxy)
+        firstSelection, self.firstSelection = self.firstSelection, None
+        if firstSelection is None:
+            self.firstSelection = (boxx, boxy)
+            return FIRST
+        icon = getLetterAndColor(self.board, boxx, boxy)
+        if getLetterAndColor(self.board, *firstSelection) != icon:
+            self.board.cover(*firstSelection)
+            self.board.cover(boxx, boxy)
+            return MISMATCH
+        self.board.match()
+        self.matchedLetters[icon[0]] += 2
+        if not self.bonusGranted and checkWord(self.matchedLetters, bonusWord):
+            self.startTick += bonusTime * FPS // 1000
+            self.bonusGranted = True
+        if not self.board.hasWon():
+            return MATCH
+        self.levelsCleared += 1
+        increaseBoardSize()
+        self.startTick = tick + CELEBRATIONTIME * FPS // 1000
+        self.board = getRandomizedBoard(self.rng)
+        self.matchedLetters = Counter()
+        self.bonusGranted = False
+        return CLEARED
+
+    def result(self, outcome):
+        return outcome, self.levelsCleared, self.board.countRevealed()
+
+def main():
+    global timeRemaining
+    if DISPLAYSURF is None:
+        init()
 
     mousex = 0
     mousey = 0
     pygame.display.set_caption('Memory Game!')
 
+    # Seed and inputs, so the game can be replayed headless; the board settings carry over between games
+    recording = replay.Recording('memory')
+    rng = random.Random(recording.seed)
+    recording.record(0, replay.SETUP, BOARDWIDTH, BOARDHEIGHT, gameTimeLimit)
+
     # Allow the player to select a theme at the beginning of the game
     selectThemeMenu()
+    recording.record(0, replay.THEME, list(themes).index(currentTheme))
 
-    mainBoard = getRandomizedBoard()
-    revealedBoxes = generateRevealedBoxesData(False)
+    game = MemoryGame(rng)
     mainMenuButton = pygame.Rect(WINDOWWIDTH - 140, 10, 130, 30)  # Define button dimensions and position
 
-    firstSelection = None
-    DISPLAYSURF.fill(COLORS['black'])
-    startGameAnimation(mainBoard)
+    stopBoxAnimations()  # Animations of a previous game
+    startGameAnimation(game.board)
 
-    startTime = pygame.time.get_ticks()
+    tick = 0  # Frames of the main loop; the timer counts these, not wall-clock time
     timeRemaining = gameTimeLimit
+    stats = profiler.get('memory')  # Frame timings, overlay on F3
+    transition = None  # Animation playing over the board; clicks on boxes wait until it is done
+    ending = None  # Message shown once the game is over
     running = True
     while running:
-        gameTimeElapsed = pygame.time.get_ticks() - startTime
-        timeRemaining = gameTimeLimit - gameTimeElapsed if gameTimeElapsed < gameTimeLimit else 0
+        if ending is not None:
+            # The result is recorded; the message stays up while events are still handled
+            for event in pygame.event.get():
+                if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
+                    replay.save(recording)
+                    stats.dump()
+                    pygame.quit()
+                    sys.exit()
+            ending.update(FPSCLOCK.get_time())
+            pygame.display.update()
+            FPSCLOCK.tick(FPS)
+            running = not ending.done
+            continue
+
+        stats.begin_frame()
+        frameTime = FPSCLOCK.get_time() if tick > 0 else 0  # Milliseconds since the last frame, for animations
+        timeRemaining = game.timeRemaining(tick)
 
         if timeRemaining <= 0:
-            gameOverAnimation()
-            running = False
-            DISPLAYSURF.fill(COLORS["black"])  # Clear the screen
+            recording.finish(*game.result(GAME_LOST))
+            ending = gameOverAnimation()
+            continue
 
         mouseClicked = False
-        DISPLAYSURF.fill(COLORS['black'])
-        drawBoard(mainBoard, revealedBoxes)
-        drawTimer(timeRemaining)
-        drawMainMenuButton(mainMenuButton)
-
-        for event in pygame.event.get():
-            if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
-                pygame.quit()
-                sys.exit()
-            elif event.type == MOUSEMOTION:
-                mousex, mousey = event.pos
-            elif event.type == MOUSEBUTTONUP:
-                mousex, mousey = event.pos
-                mouseClicked = True
-                if mainMenuButton.collidepoint(mousex, mousey):
-                    gameOverAnimationMainMenu()
-                    running = False
-                    DISPLAYSURF.fill(COLORS["black"])  # Clear the screen
-                    return
-
-        boxx, boxy = getBoxAtPixel(mousex, mousey)
-        if boxx is not None and boxy is not None:
-            if not revealedBoxes[boxx][boxy]:
-                drawHighlightBox(boxx, boxy)
-            if not revealedBoxes[boxx][boxy] and mouseClicked:
-                revealBoxesAnimation(mainBoard, [(boxx, boxy)])
-                revealedBoxes[boxx][boxy] = True
-                if firstSelection is None:
-                    firstSelection = (boxx, boxy)
-                else:
-                    icon1letter, icon1color = getLetterAndColor(mainBoard, firstSelection[0], firstSelection[1])
-                    icon2letter, icon2color = getLetterAndColor(mainBoard, boxx, boxy)
-
-                    if icon1letter != icon2letter or icon1color != icon2color:
-                        pygame.time.wait(1000)
-                        coverBoxesAnimation(mainBoard, [(firstSelection[0], firstSelection[1]), (boxx, boxy)])
-                        revealedBoxes[firstSelection[0]][firstSelection[1]] = False
-                        revealedBoxes[boxx][boxy] = False
-                    else:
-                        if checkWord(mainBoard, revealedBoxes, bonusWord):
-                            startTime += bonusTime
-
-                        if hasWon(revealedBoxes):
-                            celebrationAnimation()
-                            pygame.time.wait(2000)
-                            increaseBoardSize()
-                            startTime = pygame.time.get_ticks()
-                            mainBoard = getRandomizedBoard()
-                            revealedBoxes = generateRevealedBoxesData(False)
-                            startGameAnimation(mainBoard)
-
-                    firstSelection = None
-
-        pygame.display.update()
+        with stats.section('draw'):
+            DISPLAYSURF.fill(COLORS['black'])
+            with stats.section('drawBoard'):
+                drawBoard(game.board, game.board.revealed)
+            with stats.section('drawTimer'):
+                drawTimer(timeRemaining)
+            drawMainMenuButton(mainMenuButton)
+
+        with stats.section('events'):
+            for event in pygame.event.get():
+                if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
+                    stats.dump()
+                    pygame.quit()
+                    sys.exit()
+                elif stats.handle_event(event):
+                    pass
+                elif event.type == MOUSEMOTION:
+                    mousex, mousey = event.pos
+                elif event.type == MOUSEBUTTONUP:
+                    mousex, mousey = event.pos
+                    mouseClicked = True
+                    if mainMenuButton.collidepoint(mousex, mousey):
+                        recording.record(tick, replay.MENU)
+                        recording.finish(*game.result(GAME_QUIT))
+                        ending = gameOverAnimationMainMenu()
+                        break
+
+        with stats.section('update'):
+            if transition is not None:
+                transition.update(frameTime)  # Draws over the board
+                if transition.done:
+                    transition = None
+            boxx, boxy = getBoxAtPixel(mousex, mousey)
+            if transition is None and ending is None and boxx is not None and boxy is not None:
+                if not game.board.isRevealed(boxx, boxy):
+                    drawHighlightBox(boxx, boxy)
+                firstSelection = game.firstSelection
+                clicked = game.click(boxx, boxy, tick) if mouseClicked else None
+                if clicked is not None:
+                    recording.record(tick, replay.CLICK, boxx, boxy)
+                    revealBoxesAnimation([(boxx, boxy)])
+                    if clicked == MISMATCH:
+                        transition = mismatchAnimation(firstSelection, (boxx, boxy))
+                    elif clicked == CLEARED:
+                        stopBoxAnimations()  # They belong to the old board
+                        nextBoard = game.board
+                        transition = celebrationAnimation().call(lambda: startGameAnimation(nextBoard))
+
+        with stats.section('drawBoxAnimations'):
+            updateBoxAnimations(game.board, frameTime)
+        stats.draw_overlay(DISPLAYSURF)
+        with stats.section('present'):
+            pygame.display.update()
         FPSCLOCK.tick(FPS)
+        tick += 1
+        stats.end_frame(FPSCLOCK)
+
+    replay.save(recording)
+    stats.dump()
+    DISPLAYSURF.fill(COLORS["black"])  # Clear the screen
+
+def simulate(recording):
+    # Replay a recorded game without a display, returning (outcome, levels cleared, boxes revealed)
+    global gameTimeLimit
+    saved = (BOARDWIDTH, BOARDHEIGHT, gameTimeLimit, currentTheme)
+    rng = random.Random(recording.seed)
+    game = None
+    try:
+        for tick, code, values in recording.inputs:
+            if game is not None and game.timeRemaining(tick) <= 0:
+                break  # Time ran out before this input
+            if code == replay.SETUP:
+                if (len(values) != 3 or not 1 <= values[0] <= MAXBOARDWIDTH or not 1 <= values[1] <= MAXBOARDHEIGHT
+                        or values[0] * values[1] % 2 or values[2] <= 0):
+                    raise replay.illegal(tick, code, values)
+                width, height, gameTimeLimit = values
+                setBoardSize(width, height)
+            elif code == replay.THEME:
+                if len(values) != 1 or not 0 <= values[0] < len(themes):
+                    raise replay.illegal(tick, code, values)
+                selectTheme(list(themes)[values[0]])
+                game = MemoryGame(rng)
+            elif code == replay.MENU:
+                if game is None:
+                    raise replay.illegal(tick, code, values)
+                return game.result(GAME_QUIT)
+            elif code == replay.CLICK:
+                # The live game records only clicks that reveal a covered box of the board in play
+                if game is None or len(values) != 2 or game.click(*values, tick) is None:
+                    raise replay.illegal(tick, code, values)
+            else:
+                raise replay.illegal(tick, code, values)
+        if game is None:
+            raise replay.ReplayError("The recording never chose a theme.")
+        return game.result(GAME_LOST)
+    finally:
+        # Leave the settings of a live game untouched
+        setBoardSize(saved[0], saved[1])
+        gameTimeLimit = saved[2]
+        selectTheme(saved[3])
 
 def selectThemeMenu():
     global currentTheme
+    scheduler = idle.IdleScheduler(FPS, FPSCLOCK)  # Nothing moves on this screen, so it sleeps until input arrives
+    themeOptions = list(themes.keys())
     while True:
-        DISPLAYSURF.fill(COLORS['black'])
-        font = pygame.font.Font(None, 36)
-        text = font.render('Select Theme:', True, COLORS['white'])
-        textRect = text.get_rect()
-        textRect.center = (WINDOWWIDTH // 2, WINDOWHEIGHT // 4)
-        DISPLAYSURF.blit(text, textRect)
-
-        themeOptions = list(themes.keys())
-        for i, theme in enumerate(themeOptions):
-            themeText = font.render(theme.capitalize(), True, COLORS['white'])
-            themeRect = themeText.get_rect()
-            themeRect.center = (WINDOWWIDTH // 2, WINDOWHEIGHT // 2 + i * 40)
-            DISPLAYSURF.blit(themeText, themeRect)
-
-        pygame.display.update()
-
-        for event in pygame.event.get():
+        events = scheduler.poll()
+        if scheduler.dirty:
+            DISPLAYSURF.fill(COLORS['black'])
+            text = text_cache.render(MENUFONT, 'Select Theme:', COLORS['white'])
+            textRect = text.get_rect()
+            textRect.center = (WINDOWWIDTH // 2, WINDOWHEIGHT // 4)
+            DISPLAYSURF.blit(text, textRect)
+
+            for i, theme in enumerate(themeOptions):
+                themeText = text_cache.render(MENUFONT, theme.capitalize(), COLORS['white'])
+                themeRect = themeText.get_rect()
+                themeRect.center = (WINDOWWIDTH // 2, WINDOWHEIGHT // 2 + i * 40)
+                DISPLAYSURF.blit(themeText, themeRect)
+
+            pygame.display.update()
+
+        for event in events:
             if event.type == QUIT or (event.type == KEYUP and event.key == K_ESCAPE):
                 pygame.quit()
                 sys.exit()
@@ -335,6 +533,7 @@ def selectThemeMenu():
 # Define run_game_[game] for arcade interface.
 def run_game_memory():
     print("Starting Memory Game...")
+    fonts.warm_up()  # Resolve fonts before the first frame
     main()  # Start the Game
 
 if __name__ == '__main__':
@@ -0,0 +1,56 @@
+# Memory - compact board
+# Boxes hold small icon ids in one flat array, and which boxes show their icon is a single integer
+# bitset. Matched pairs are counted as they happen, so checking for a win does not look at the board.
+import random
+from array import array
+
+
+class MemoryBoard:
+    """Memory board of width x height boxes, indexed (x, y) like the old list of columns.
+
+    Box (x, y) is stored at x * height + y. Icon ids index `icons`, the theme's (letter, color) pairs.
+    """
+    def __init__(self, width, height, icons, rng=random):
+        if (width * height) % 2:
+            raise ValueError(f"A {width}x{height} board has an odd number of boxes; every box needs a pair.")
+        self.width = width
+        self.height = height
+        self.icons = icons
+        self.pairs = width * height // 2
+        self.revealed = 0  # Bit x * height + y is set while box (x, y) shows its icon
+        self.matchedPairs = 0
+
+        # Pick the icons at random and shuffle two of each; boards with more pairs than the theme has
+        # icons use every icon again, as many times as needed
+        ids = list(range(len(icons)))
+        rng.shuffle(ids)
+        ids = (ids * (self.pairs // len(ids) + 1))[:self.pairs] * 2
+        rng.shuffle(ids)
+        self.cells = array('H', ids)
+
+    def icon(self, boxx, boxy):
+        """(letter, color) of a box."""
+        return self.icons[self.cells[boxx * self.height + boxy]]
+
+    def isRevealed(self, boxx, boxy):
+        return self.revealed >> (boxx * self.height + boxy) & 1 == 1
+
+    def reveal(self, boxx, boxy):
+        self.revealed |= 1 << (boxx * self.height + boxy)
+
+    def cover(self, boxx, boxy):
+        self.revealed &= ~(1 << (boxx * self.height + boxy))
+
+    def match(self):
+        """Count a matched pair; both of its boxes stay revealed."""
+        self.matchedPairs += 1
+
+    def hasWon(self):
+        return self.matchedPairs == self.pairs
+
+    def countRevealed(self):
+        return bin(self.revealed).count('1')
+
+    def allBoxes(self):
+        """Bitset with every box set, for drawing the whole board revealed."""
+        return (1 << (self.width * self.height)) - 1
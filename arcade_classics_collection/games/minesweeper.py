@@ -1,9 +1,11 @@
 # Minesweeper
 # Import necessary libraries
 import pygame
-import random
 import sys
 
+from games import fonts, idle, profiler, replay, text_cache, tween
+from games.minesweeper_board import MinesweeperBoard
+
 # Define colors using RGB values
 COLORS = {
     'white': (239, 235, 235),   # Define white, light grayish
@@ -14,52 +16,74 @@ COLORS = {
     'green': (143, 188, 143)  # Define light green, a muted sage green
 }
 
-# Initialize pygame module
-pygame.init()
-# Set Caption to 'Minesweeper Game!'
-pygame.display.set_caption('Minesweeper Game!')
 # Set the dimensions for the game window
 WINDOW_WIDTH, WINDOW_HEIGHT = 800, 600
-# Create a surface on screen that has the size of WINDOW_WIDTH x WINDOW_HEIGHT
-game_window = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-# Create standard font for text and size
-font = pygame.font.SysFont('times new roman', 36)
-# Create an object to help track time
-clock = pygame.time.Clock()
+# Surface to draw on and clock, set by init() so importing this module opens no window
+game_window = None
+clock = None
+# Standard font for text as a (name, size) spec for the shared text cache
+font = fonts.font('times new roman', 36)
+
+def init(surface=None):  # Use the launcher's surface, or open a window when run on its own
+    global game_window, clock
+    if surface is None:
+        # Initialize pygame module and create a surface of WINDOW_WIDTH x WINDOW_HEIGHT
+        pygame.init()
+        surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    game_window = surface
+    # Create an object to help track time
+    clock = pygame.time.Clock()
 
 # Define constants for the game
 GRID_SIZE = 10  # Number of cells in each row and column
 CELL_SIZE = 60  # Pixel size of each cell
 NUM_MINES = 10  # Total number of mines to place on the grid
-# Class to manage cells and mines
+GAME_QUIT, GAME_LOST, GAME_WON = 0, 1, 2  # How a game ended, stored in recordings
+# Class to manage cells and mines, as a view onto one cell of a MinesweeperBoard
 class Cell:
-    def __init__(self, x, y):  # Constructor initializes cell properties
-        self.is_mine = False
-        self.revealed = False
-        self.flagged = False
+    def __init__(self, x, y, board):  # Constructor stores the cell's position and its board
         self.x = x
         self.y = y
-        self.adjacent_mines = 0
-
-    def reveal(self, grid):  # Reveal cell
-        if not self.revealed and not self.flagged:  # Don't reveal flagged ones.
-            self.revealed = True
-            if self.adjacent_mines == 0 and not self.is_mine:  # Only when 0 mines are next to the cell, reveal neighbors
-                directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]  # Directions for 8 neighbors
-                for dx, dy in directions:
-                    nx, ny = self.x + dx, self.y + dy
-                    # Check if the neighbor is within the grid boundaries
-                    if 0 <= nx < GRID_SIZE and 0 <= ny < GRID_SIZE:
-                        neighbor = grid[nx][ny]
-                        if not neighbor.revealed:
-                            neighbor.reveal(grid)  # Reveal neighbor
+        self.board = board
+
+    # Cell state is read from and written to the board's arrays
+    @property
+    def is_mine(self):
+        return bool(self.board.mines[self.x, self.y])
+
+    @property
+    def adjacent_mines(self):
+        return int(self.board.adjacent[self.x, self.y])
+
+    @property
+    def revealed(self):
+        return bool(self.board.revealed[self.x, self.y])
+
+    @revealed.setter
+    def revealed(self, value):
+        self.board.set_revealed(self.x, self.y, value)
+
+    @property
+    def flagged(self):
+        return bool(self.board.flagged[self.x, self.y])
+
+    @flagged.setter
+    def flagged(self, value):
+        self.board.set_flagged(self.x, self.y, value)
+
+    def reveal(self, grid):  # Reveal cell, returns the list of newly revealed cells
+        # The board does the flood fill (flagged cells stay covered); map its coordinates to the grid
+        return [grid[x][y] for x, y in self.board.reveal(self.x, self.y).tolist()]
 
     def force_reveal(self):  # For game over or game won, show all cells
         if not self.revealed:  # Reduce unnecessary revealing
             self.revealed = True  # This forcibly reveals the cell
 
+    def get_rect(self):  # Screen area covered by the cell
+        return pygame.Rect(100 + self.x * CELL_SIZE, self.y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+
     def draw(self):  # Draws each cell based on its state (revealed, flagged, mine)
-        rect = pygame.Rect(100 + self.x * CELL_SIZE, self.y * CELL_SIZE, CELL_SIZE, CELL_SIZE)
+        rect = self.get_rect()
         if self.revealed:  # Only revealed
             if self.is_mine:
                 # Draw mine
@@ -69,120 +93,204 @@ class Cell:
                 pygame.draw.rect(game_window, COLORS["white"], rect)  # Base Color
                 if self.adjacent_mines > 0:  # When mines adjacent
                     # Show number of adjacent mines
-                        text = font.render(str(self.adjacent_mines), True, COLORS["black"])
+                        text = text_cache.render(font, str(self.adjacent_mines), COLORS["black"])
                         text_rect = text.get_rect(center=rect.center)
                         game_window.blit(text, text_rect)
         else:  # Draw unrevealed cell, dark / covered
             pygame.draw.rect(game_window, COLORS["darkgrey"], rect)
             if self.flagged:
                 # Show flag on flagged cells
-                text = font.render('F', True, COLORS["green"])
+                text = text_cache.render(font, 'F', COLORS["green"])
                 text_rect = text.get_rect(center=rect.center)
                 game_window.blit(text, text_rect)
         # Draw grey border for cell
         pygame.draw.rect(game_window, COLORS["grey"], rect, 1)  # Border
 
-def create_grid():
-    grid = [[Cell(x, y) for y in range(GRID_SIZE)] for x in range(GRID_SIZE)]
-    mine_locations = set()
-    while len(mine_locations) < NUM_MINES:
-        mine_locations.add((random.randint(0, GRID_SIZE - 1), random.randint(0, GRID_SIZE - 1)))
-    for (x, y) in mine_locations:
-        grid[x][y].is_mine = True
-    for x in range(GRID_SIZE):
-        for y in range(GRID_SIZE):
-            if not grid[x][y].is_mine:
-                grid[x][y].adjacent_mines = sum(1 for dx in (-1, 0, 1) for dy in (-1, 0, 1)
-                                               if 0 <= x + dx < GRID_SIZE and 0 <= y + dy < GRID_SIZE
-                                               and grid[x + dx][y + dy].is_mine)
-    return grid
-
-def check_win_condition(grid):
-    for row in grid:
-        for cell in row:
-            # If there's a non-mine cell that isn't revealed, or a mine that isn't flagged, return False
-            if (not cell.is_mine and not cell.revealed) or (cell.is_mine and not cell.flagged):
-                return False
-    return True  # All conditions met for a win
+# Class to remember which cells changed, so a frame only redraws and pushes those cells
+class DirtyCells:
+    def __init__(self):
+        self.cells = set()
+        self.full_redraw = True  # The first frame draws the whole window
+
+    def mark(self, cells):  # Queue changed cells for the next frame
+        self.cells.update(cells)
+
+    def mark_all(self):  # Redraw everything, e.g. after the window was covered
+        self.full_redraw = True
+
+    def flush(self, grid, stats):  # Draw the pending cells and push only their rectangles to the screen
+        if self.full_redraw:
+            with stats.section('draw'):
+                with stats.section('Cell.draw'):
+                    game_window.fill(COLORS["black"])  # Clear the screen
+                    for row in grid:
+                        for cell in row:
+                            cell.draw()
+                stats.draw_overlay(game_window)
+            with stats.section('present'):
+                pygame.display.flip()  # Update the full display Surface to the screen
+        else:
+            rects = []
+            with stats.section('draw'):
+                if self.cells:
+                    with stats.section('Cell.draw'):
+                        for cell in self.cells:
+                            cell.draw()
+                    rects = [cell.get_rect() for cell in self.cells]
+                overlay = stats.draw_overlay(game_window)  # Drawn over the cells while it is shown
+            if overlay:
+                rects.append(overlay)
+            if rects:
+                with stats.section('present'):
+                    pygame.display.update(rects)
+        # Idle frames with nothing pending draw nothing at all
+        self.full_redraw = False
+        self.cells.clear()
+
+def create_grid(board=None):
+    # Mines and adjacency counts are computed by the array board; the grid holds Cell views onto it
+    if board is None:
+        board = MinesweeperBoard(GRID_SIZE, GRID_SIZE, NUM_MINES)
+    return [[Cell(x, y, board) for y in range(board.height)] for x in range(board.width)]
+
+def check_win_condition(board):
+    # The board counts unrevealed safe cells and flagged mines as they change, so no grid scan is needed
+    return board.is_won()  # Every safe cell revealed and every mine flagged
 def game_won_message():  # Game Won Message at the end
     game_window.fill(COLORS["black"])  # Clear the screen for message
-    game_won = font.render('GAME WON!', True, COLORS['green'])
+    game_won = text_cache.render(font, 'GAME WON!', COLORS['green'])
     game_window.blit(game_won, (WINDOW_WIDTH / 2 - game_won.get_width() / 2,
                                  WINDOW_HEIGHT / 2 - game_won.get_height() / 2))
     pygame.display.flip()  # Update the display to show the game won message
-    pygame.time.wait(3000)  # wait 3 seconds
 def game_over_message():  # Game Over Message at the end
     game_window.fill(COLORS["black"])  # Clear the screen for message
-    game_over = font.render('Landed on a mine. GAME OVER!', True, COLORS['red'])
+    game_over = text_cache.render(font, 'Landed on a mine. GAME OVER!', COLORS['red'])
     game_window.blit(game_over, (WINDOW_WIDTH / 2 - game_over.get_width() / 2,
                                  WINDOW_HEIGHT / 2 - game_over.get_height() / 2))
     pygame.display.flip()  # Update the display to show the game over message
-    pygame.time.wait(3000)  # Allow time for the player to read the message
+
+def end_of_game(grid, message):  # Reveal and draw all cells, returning the timeline of the end screens
+    for row in grid:
+        for cell in row:
+            cell.force_reveal()
+    for row in grid:
+        for cell in row:
+            cell.draw()
+    pygame.display.flip()  # Update the display to show all mines
+    # Three seconds to look at the mines, then three seconds for the message; the game loop plays it
+    return tween.Timeline().wait(3000).call(message).wait(3000)
 
 def game_loop():  # Define game_loop function
-    grid = create_grid()  # Initialize the grid with cells and mines
+    # Set Caption to 'Minesweeper Game!'
+    pygame.display.set_caption('Minesweeper Game!')
+    recording = replay.Recording('minesweeper')  # Seed and inputs, so the game can be replayed headless
+    board = MinesweeperBoard(GRID_SIZE, GRID_SIZE, NUM_MINES, seed=recording.seed)  # Place the mines
+    grid = create_grid(board)  # Initialize the grid with cells viewing the board
+    dirty = DirtyCells()  # Cells to redraw on the next frame
+    tick = 0  # Frames since the start, used to timestamp recorded inputs
+    result = None
+    stats = profiler.get('minesweeper')  # Frame timings, overlay on F3
+    scheduler = idle.IdleScheduler(60, clock)  # 60 frames per second while busy, asleep until input while idle
+
+    ending = None  # End screens, played once the result is known
 
     # Define a variable to control the game loop
     running = True
     while running:  # Game Loop
-        # event handling, gets all event from the event queue
-        for event in pygame.event.get():
-            # Only do something if the event is of type QUIT
-            if event.type == pygame.QUIT:
-                # Change the value running to 'False', to exit the game loop
+        stats.begin_frame()
+        scheduler.animating = ending is not None or stats.overlay_visible  # End screens and the overlay keep moving
+        events = scheduler.poll()  # Nothing changes between clicks, so this sleeps until input arrives
+        if ending is not None:
+            # The result is decided; the end screens play on, and closing the window skips them
+            if any(event.type == pygame.QUIT for event in events):
                 running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                x, y = (event.pos[0] - 100) // CELL_SIZE, event.pos[1] // CELL_SIZE
-                if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:  # Ensure the click is within the grid
-                    if event.button == 1:  # Left click
-                        if not grid[x][y].flagged:  # Only reveal if not flagged
-                            grid[x][y].reveal(grid)  # Use  reveal
-                            if grid[x][y].is_mine:
-                                print("Game Over!")  # Indicate game over
-                                # Reveal all cells because a mine was clicked
-                                for row in grid:
-                                    for cell in row:
-                                        cell.force_reveal()
-                                for row in grid:
-                                    for cell in row:
-                                        cell.draw()
-                                pygame.display.flip()  # Update the display to show all mines
-                                pygame.time.wait(3000)  # Wait three seconds to show the mines
-                                game_over_message()  # Show Game over Message
-                                running = False  # Stop the game loop after displaying the message
-
-                    elif event.button == 3:  # Right click
-                        # Toggle flag on and off
-                        grid[x][y].flagged = not grid[x][y].flagged
-
-
-        if running:
-            game_window.fill(COLORS["black"])  # Clear the screen
-            # Draw all cells
-            for row in grid:
-                for cell in row:
-                    cell.draw()
-            if check_win_condition(grid):
+            ending.update(clock.get_time())
+            if ending.done:
+                running = False
+            continue
+        with stats.section('events'):
+            # event handling, gets all event from the event queue
+            for event in events:
+                # Only do something if the event is of type QUIT
+                if event.type == pygame.QUIT:
+                    # Change the value running to 'False', to exit the game loop
+                    running = False
+                    recording.record(tick, replay.QUIT)
+                    result = (GAME_QUIT, board.hidden_safe, board.flagged_mines)
+                    break  # Ignore the rest of the events, as the replay does
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    dirty.mark_all()  # The window contents may have been lost
+                elif stats.handle_event(event):
+                    dirty.mark_all()  # Showing or hiding the overlay repaints the whole board
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    x, y = (event.pos[0] - 100) // CELL_SIZE, event.pos[1] // CELL_SIZE
+                    if 0 <= x < GRID_SIZE and 0 <= y < GRID_SIZE:  # Ensure the click is within the grid
+                        if event.button == 1:  # Left click
+                            if not grid[x][y].flagged:  # Only reveal if not flagged
+                                recording.record(tick, replay.REVEAL, x, y)
+                                dirty.mark(grid[x][y].reveal(grid))  # Use reveal, redraw what it opened
+                                if grid[x][y].is_mine:
+                                    print("Game Over!")  # Indicate game over
+                                    result = (GAME_LOST, board.hidden_safe, board.flagged_mines)
+                                    # Reveal all cells because a mine was clicked, then show Game over Message
+                                    ending = end_of_game(grid, game_over_message)
+                                    break
+
+                        elif event.button == 3:  # Right click
+                            # Toggle flag on and off
+                            recording.record(tick, replay.FLAG, x, y)
+                            grid[x][y].flagged = not grid[x][y].flagged
+                            dirty.mark([grid[x][y]])
+
+        if running and ending is None:
+            with stats.section('update'):
+                won = check_win_condition(board)
+            if won:
                 print("Game WON!")  # Indicate game over
-                # Reveal all mines because game won
-                for row in grid:
-                    for cell in row:
-                        cell.force_reveal()
-                for row in grid:
-                    for cell in row:
-                        cell.draw()
-                pygame.display.flip()  # Update the display to show all mines
-                pygame.time.wait(3000)  # Wait three seconds to show the revealed mines
-                game_won_message()  # Show game won message
-                running = False  # Stop the game loop after displaying the message
-
-            pygame.display.flip()  # Update the full display Surface to the screen
-
-        clock.tick(60)  # Maintain 60 frames per second
+                result = (GAME_WON, board.hidden_safe, board.flagged_mines)
+                # Reveal all mines because game won, then show game won message
+                ending = end_of_game(grid, game_won_message)
+            else:
+                dirty.flush(grid, stats)  # Draw only the cells that changed
+
+        tick += 1
+        if running and scheduler.dirty:
+            stats.end_frame(clock)
+
+    recording.finish(*result)
+    replay.save(recording)
+    stats.dump()
+
+def simulate(recording):  # Replay a recorded game without a display, returning (outcome, hidden safe cells, flagged mines)
+    board = MinesweeperBoard(GRID_SIZE, GRID_SIZE, NUM_MINES, seed=recording.seed)
+    last_tick = 0
+    for tick, code, values in recording.inputs:
+        # The game checks for a win once per frame, after that frame's inputs
+        if tick != last_tick and board.is_won():
+            return GAME_WON, board.hidden_safe, board.flagged_mines
+        last_tick = tick
+        if code == replay.QUIT:
+            return GAME_QUIT, board.hidden_safe, board.flagged_mines
+        # The live game records only clicks on the grid, and never reveals a flagged cell
+        if code not in (replay.REVEAL, replay.FLAG) or len(values) != 2 or not board.in_bounds(*values):
+            raise replay.illegal(tick, code, values)
+        x, y = values
+        if code == replay.REVEAL:
+            if board.flagged[x, y]:
+                raise replay.illegal(tick, code, values)
+            board.reveal(x, y)
+            if board.mines[x, y]:
+                return GAME_LOST, board.hidden_safe, board.flagged_mines
+        else:
+            board.toggle_flag(x, y)
+    return (GAME_WON if board.is_won() else GAME_QUIT), board.hidden_safe, board.flagged_mines
 
 # Define run_game_[game] for arcade interface.
 def run_game_minesweeper():
     print("Starting Minesweeper Game...")
+    if game_window is None:
+        init()
+    fonts.warm_up()  # Resolve fonts before the first frame
     game_loop()  # Start the game loop after exiting the menu
 
 # Start main
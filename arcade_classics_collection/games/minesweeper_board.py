@@ -0,0 +1,141 @@
+# Minesweeper - array-backed board
+# Mines, adjacency counts and the revealed/flagged state live in NumPy arrays,
+# so even very large boards are generated in a few vectorised passes.
+import numpy as np
+
+
+def adjacent_mine_counts(mines):
+    """Count the mines around every cell with one 3x3 neighbour sum (mine cells get 0)."""
+    padded = np.pad(mines.astype(np.uint8), 1)
+    # The 3x3 box sum is separable: sum three shifted copies along x, then along y
+    rows = padded[:-2] + padded[1:-1] + padded[2:]
+    box = rows[:, :-2] + rows[:, 1:-1] + rows[:, 2:]
+    counts = box - mines  # Do not count the cell itself
+    counts[mines] = 0  # Like Cell.adjacent_mines, mines keep a count of 0
+    return counts
+
+
+class MinesweeperBoard:
+    """Minesweeper board as NumPy arrays indexed [x, y], like the grid of Cells."""
+    def __init__(self, width, height, num_mines, seed=None):
+        if not 0 <= num_mines <= width * height:
+            raise ValueError(f"Cannot place {num_mines} mines on a {width}x{height} board.")
+        self.width = width
+        self.height = height
+        self.num_mines = num_mines
+        rng = np.random.default_rng(seed)
+
+        self.mines = np.zeros((width, height), dtype=bool)
+        self.mines.flat[rng.choice(width * height, size=num_mines, replace=False)] = True
+        self.adjacent = adjacent_mine_counts(self.mines)
+        self.revealed = np.zeros((width, height), dtype=bool)
+        self.flagged = np.zeros((width, height), dtype=bool)
+
+        # Counters kept up to date by reveals and flag changes, so checking for a win is O(1)
+        self.hidden_safe = width * height - num_mines  # Safe cells not revealed yet
+        self.flagged_mines = 0  # Mines that carry a flag
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def set_revealed(self, x, y, value=True):
+        """Set one cell's revealed state and update the counters."""
+        if self.revealed[x, y] != value:
+            self.revealed[x, y] = value
+            if not self.mines[x, y]:
+                self.hidden_safe += -1 if value else 1
+
+    def set_flagged(self, x, y, value=True):
+        """Set one cell's flag and update the counters."""
+        if self.flagged[x, y] != value:
+            self.flagged[x, y] = value
+            if self.mines[x, y]:
+                self.flagged_mines += 1 if value else -1
+
+    def toggle_flag(self, x, y):
+        self.set_flagged(x, y, not self.flagged[x, y])
+
+    def is_won(self):
+        """All safe cells revealed and every mine flagged."""
+        return self.hidden_safe == 0 and self.flagged_mines == self.num_mines
+
+    def reveal(self, x, y):
+        """Reveal a cell and flood-fill outwards from empty cells without recursion.
+
+        Returns an (n, 2) array with the (x, y) coordinates of every newly revealed cell.
+        """
+        if self.revealed[x, y] or self.flagged[x, y]:
+            return np.empty((0, 2), dtype=np.intp)
+        if self.mines[x, y] or self.adjacent[x, y] > 0:
+            self.set_revealed(x, y)
+            return np.array([[x, y]], dtype=np.intp)
+
+        # Cells the fill may pass through: unrevealed, unflagged, safe cells with no adjacent mines
+        passable = ~(self.mines | self.revealed | self.flagged) & (self.adjacent == 0)
+        filled = scanline_fill(passable, x, y)
+
+        # Every filled cell and its 8 neighbours get revealed (flags stay covered)
+        xs, ys = np.nonzero(filled)
+        x0, x1 = max(xs.min() - 1, 0), min(xs.max() + 2, self.width)
+        y0, y1 = max(ys.min() - 1, 0), min(ys.max() + 2, self.height)
+        region = filled[x0:x1, y0:y1]
+        grown = np.pad(region, 1)
+        grown = grown[:-2] | grown[1:-1] | grown[2:]
+        grown = grown[:, :-2] | grown[:, 1:-1] | grown[:, 2:]
+        newly = grown & ~self.revealed[x0:x1, y0:y1] & ~self.flagged[x0:x1, y0:y1]
+        self.revealed[x0:x1, y0:y1] |= newly
+        self.hidden_safe -= int(np.count_nonzero(newly))  # Cells next to empty cells are never mines
+        return np.argwhere(newly) + (x0, y0)
+
+
+def scanline_fill(passable, x, y):
+    """8-connected flood fill of `passable` from (x, y), working on runs of cells along y.
+
+    Every run of passable cells is found with array operations, runs in neighbouring rows that
+    touch (diagonals included) are linked, and only the graph of runs is walked in Python.
+    """
+    width, height = passable.shape
+    # Runs start where a row steps from blocked to passable and end one past where it steps back
+    padded = np.zeros((width, height + 2), dtype=np.int8)
+    padded[:, 1:-1] = passable
+    steps = np.diff(padded, axis=1)
+    run_x, run_start = np.nonzero(steps == 1)
+    run_end = np.nonzero(steps == -1)[1]
+
+    # Sortable keys, one row per `stride`; runs come out of np.nonzero already sorted by (x, start)
+    stride = height + 1
+    start_key = run_x * stride + run_start
+    end_key = run_x * stride + run_end
+
+    # Runs in the next row that touch each run: their end >= its start and their start <= its end
+    next_row = (run_x + 1) * stride
+    first = np.searchsorted(end_key, next_row + run_start, side='left')
+    last = np.searchsorted(start_key, next_row + run_end, side='right')
+    counts = np.maximum(last - first, 0)
+    source = np.repeat(np.arange(len(run_x)), counts)
+    target = np.repeat(first, counts) + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    # Adjacency lists in both directions, in compressed form
+    sources = np.concatenate((source, target))
+    targets = np.concatenate((target, source))
+    order = np.argsort(sources, kind='stable')
+    neighbours = targets[order].tolist()
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=len(run_x))))).tolist()
+
+    # Walk the run graph from the run containing (x, y) with an explicit stack
+    start = int(np.searchsorted(start_key, x * stride + y, side='right')) - 1
+    reached = np.zeros(len(run_x), dtype=bool)
+    reached[start] = True
+    stack = [start]
+    while stack:
+        run = stack.pop()
+        for other in neighbours[offsets[run]:offsets[run + 1]]:
+            if not reached[other]:
+                reached[other] = True
+                stack.append(other)
+
+    # Paint the reached runs: +1 at each start, -1 one past each end, then a running sum per row
+    marks = np.zeros((width, stride), dtype=np.int8)
+    marks[run_x[reached], run_start[reached]] = 1
+    marks[run_x[reached], run_end[reached]] = -1
+    return np.cumsum(marks, axis=1, dtype=np.int8)[:, :height].astype(bool)
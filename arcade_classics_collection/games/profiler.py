@@ -0,0 +1,132 @@
+# Frame-time profiling for the game loops and the launcher
+# A loop wraps the phases of each frame (events, update, draw, present, or finer sections such as
+# drawBoard) in profiler.section(); per-frame times and FPS go into a ring buffer. F3 toggles an
+# overlay with recent averages, and the buffer is written to CSV and JSON when the loop ends.
+import contextlib
+import csv
+import json
+import os
+import time
+from collections import deque
+
+import pygame
+
+from games import fonts
+
+ENABLED = bool(os.environ.get('ARCADE_PROFILE'))  # Record from the start; F3 also turns recording on
+PROFILE_DIR = 'profiles'  # Where dumps are written
+HISTORY = 600  # Frames kept in each ring buffer
+OVERLAY_KEY = pygame.K_F3
+OVERLAY_FONT = fonts.font(None, 20)
+OVERLAY_REFRESH = 250  # Milliseconds between overlay text updates
+
+_profilers = {}
+
+
+def get(name):
+    """Return the profiler for a loop, creating it the first time the loop asks for it."""
+    if name not in _profilers:
+        _profilers[name] = FrameProfiler(name)
+    return _profilers[name]
+
+
+class FrameProfiler:
+    """Per-frame section timings for one loop, kept in a ring buffer."""
+    def __init__(self, name, history=HISTORY):
+        self.name = name
+        self.enabled = ENABLED
+        self.frames = deque(maxlen=history)  # Dicts of section name -> milliseconds, plus 'fps'
+        self.current = {}
+        self.frame_start = None
+        self.overlay_visible = False
+        self.overlay_surface = None
+        self.overlay_updated = 0
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    @contextlib.contextmanager
+    def _timed(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[name] = self.current.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def section(self, name):
+        """Context manager timing one part of the frame; nested and repeated sections are allowed."""
+        if not self.enabled:
+            return contextlib.nullcontext()
+        return self._timed(name)
+
+    def end_frame(self, clock=None):
+        if not self.enabled or self.frame_start is None:
+            return
+        self.current['frame'] = (time.perf_counter() - self.frame_start) * 1000
+        self.current['fps'] = clock.get_fps() if clock is not None else 0.0
+        self.frames.append(self.current)
+        self.frame_start = None
+
+    def handle_event(self, event):
+        """Toggle the overlay on the hotkey; returns True if the event was used."""
+        if event.type == pygame.KEYDOWN and event.key == OVERLAY_KEY:
+            self.overlay_visible = not self.overlay_visible
+            self.enabled = True
+            self.overlay_surface = None
+            return True
+        return False
+
+    def averages(self, frames=60):
+        """Mean of every recorded value over the most recent frames."""
+        recent = list(self.frames)[-frames:]
+        totals = {}
+        for record in recent:
+            for name, value in record.items():
+                totals[name] = totals.get(name, 0.0) + value
+        return {name: total / len(recent) for name, total in totals.items()}
+
+    def draw_overlay(self, surface):
+        """Draw the overlay in the top right corner; returns the rect it covered, or None."""
+        if not self.overlay_visible:
+            return None
+        now = pygame.time.get_ticks()
+        if self.overlay_surface is None or now - self.overlay_updated >= OVERLAY_REFRESH:
+            self.overlay_surface = self._render_overlay()
+            self.overlay_updated = now
+        rect = self.overlay_surface.get_rect(topright=(surface.get_width() - 5, 5))
+        surface.blit(self.overlay_surface, rect)
+        return rect
+
+    def _render_overlay(self):
+        averages = self.averages()
+        text = [f"{self.name}  {averages.pop('fps', 0.0):.1f} fps"]
+        text += [f"{name}: {value:.2f} ms" for name, value in sorted(averages.items())]
+        # Changing numbers would churn the shared text cache, so the overlay renders directly
+        font = fonts.get_font(OVERLAY_FONT)
+        lines = [font.render(line, True, (239, 235, 235)) for line in text]
+        overlay = pygame.Surface((max(line.get_width() for line in lines) + 10,
+                                  sum(line.get_height() for line in lines) + 10))
+        y = 5
+        for line in lines:
+            overlay.blit(line, (5, y))
+            y += line.get_height()
+        return overlay
+
+    def dump(self, directory=None):
+        """Write the ring buffer to CSV and JSON files; returns their paths (None if nothing recorded)."""
+        if not self.frames:
+            return None
+        directory = directory or PROFILE_DIR
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}")
+        columns = sorted({name for record in self.frames for name in record})
+        with open(base + '.csv', 'w', newline='') as csv_file:
+            writer = csv.DictWriter(csv_file, fieldnames=columns, restval=0.0)
+            writer.writeheader()
+            writer.writerows(self.frames)
+        with open(base + '.json', 'w') as json_file:
+            json.dump({'name': self.name, 'averages': self.averages(len(self.frames)),
+                       'frames': list(self.frames)}, json_file, indent=1)
+        self.frames.clear()
+        return base + '.csv', base + '.json'
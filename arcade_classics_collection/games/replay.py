@@ -0,0 +1,158 @@
+# Deterministic input recording and replay for all games
+# A recording holds the seed of a game session, every input applied to it with the tick it was
+# applied on, and the final result. Each game module provides simulate(recording), which replays
+# the inputs without a display as fast as possible and returns the result it reaches.
+import importlib
+import os
+import random
+import struct
+import sys
+import time
+
+MAGIC = b'ACR1'  # Arcade Classics Recording, format version 1
+GAME_IDS = {'snake': 1, 'minesweeper': 2, 'memory': 3, 'hangman': 4}
+GAME_NAMES = {game_id: game for game, game_id in GAME_IDS.items()}
+REPLAY_DIR = 'replays'  # Finished sessions are saved here; set to None to keep them in memory only
+
+# Input codes shared by all games; each game documents the values it stores with them
+SETUP, TURN, REVEAL, FLAG, CLICK, THEME, GUESS, MENU, QUIT = range(1, 10)
+
+
+class ReplayError(ValueError):
+    """Raised when a recording cannot be decoded, or holds an input the game could not have recorded."""
+
+
+def illegal(tick, code, values):
+    """ReplayError for an input that the live game never records, e.g. a click off the board."""
+    return ReplayError(f"Illegal input {code} {values} at tick {tick}.")
+
+
+class Recording:
+    """Seed, per-tick input stream and final result of one game session."""
+    def __init__(self, game, seed=None):
+        if game not in GAME_IDS:
+            raise ValueError(f"Unknown game {game!r}.")
+        self.game = game
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.inputs = []  # (tick, code, values) in the order they were applied
+        self.result = ()
+
+    def record(self, tick, code, *values):
+        self.inputs.append((tick, code, values))
+
+    def finish(self, *result):
+        self.result = result
+
+    def to_bytes(self):
+        out = bytearray(MAGIC)
+        out += struct.pack('<BQ', GAME_IDS[self.game], self.seed)
+        _write_values(out, self.result)
+        _write_varint(out, len(self.inputs))
+        last_tick = 0
+        for tick, code, values in self.inputs:
+            _write_varint(out, tick - last_tick)  # Ticks only grow, so store the gaps
+            out.append(code)
+            _write_values(out, values)
+            last_tick = tick
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ReplayError("Not an Arcade Classics recording.")
+        try:
+            game_id, seed = struct.unpack_from('<BQ', data, 4)
+            recording = cls(GAME_NAMES[game_id], seed)
+            pos = 13
+            recording.result, pos = _read_values(data, pos)
+            count, pos = _read_varint(data, pos)
+            tick = 0
+            for _ in range(count):
+                gap, pos = _read_varint(data, pos)
+                tick += gap
+                code = data[pos]
+                values, pos = _read_values(data, pos + 1)
+                recording.inputs.append((tick, code, values))
+        except (KeyError, IndexError, struct.error) as error:
+            raise ReplayError(f"Corrupt recording: {error}") from error
+        return recording
+
+
+# Variable-length integers: 7 bits per byte, signed values zigzag-encoded so small magnitudes stay short
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _write_values(out, values):
+    _write_varint(out, len(values))
+    for value in values:
+        _write_varint(out, value * 2 if value >= 0 else -value * 2 - 1)
+
+
+def _read_values(data, pos):
+    count, pos = _read_varint(data, pos)
+    values = []
+    for _ in range(count):
+        value, pos = _read_varint(data, pos)
+        values.append(value >> 1 if not value & 1 else -(value >> 1) - 1)
+    return tuple(values), pos
+
+
+def save(recording, directory=None):
+    """Write a finished recording to the replay directory and return its path (None if disabled)."""
+    directory = directory or REPLAY_DIR
+    if directory is None:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{recording.game}-{time.strftime('%Y%m%d-%H%M%S')}-{recording.seed:x}.acr")
+    with open(path, 'wb') as replay_file:
+        replay_file.write(recording.to_bytes())
+    return path
+
+
+def load(path):
+    with open(path, 'rb') as replay_file:
+        return Recording.from_bytes(replay_file.read())
+
+
+def simulate(recording):
+    """Replay a recording headless and return the result the game reaches."""
+    return importlib.import_module(f"games.{recording.game}").simulate(recording)
+
+
+def verify(recording):
+    """True when replaying the inputs reproduces the recorded result; illegal inputs never do."""
+    try:
+        return tuple(simulate(recording)) == tuple(recording.result)
+    except ReplayError:
+        return False
+
+
+# Verify recordings from the command line: python -m games.replay replays/*.acr
+if __name__ == '__main__':
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')  # Never open a window while verifying
+    # Games raise games.replay.ReplayError, which is not this __main__ module's class of the same name
+    from games.replay import load, verify
+    failures = 0
+    start = time.perf_counter()
+    for path in sys.argv[1:]:
+        ok = verify(load(path))
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {path}")
+    elapsed = time.perf_counter() - start
+    print(f"{len(sys.argv) - 1} replays verified in {elapsed:.3f}s, {failures} failed")
+    sys.exit(1 if failures else 0)
@@ -1,11 +1,8 @@
 # Snake Game
 import pygame
-import random
 
-# Set up the dimensions of the game window
-WINDOW_WIDTH, WINDOW_HEIGHT = 800, 600
-INITIAL_SNAKE_SPEED = 10  # Initial speed of the snake
-BLOCK_SIZE = 10  # Size of each block of snake and fruit
+from games import fonts, profiler, replay, text_cache, tween
+from games.snake_engine import SnakeEngine, DIRECTIONS, WINDOW_WIDTH, WINDOW_HEIGHT, BLOCK_SIZE
 
 # Define colors used in the game using RGB values
 COLORS = {
@@ -18,176 +15,162 @@ COLORS = {
     'yellow': (245, 220, 80)  # Define yellow, a muted gold-like yellow
 }
 
-# Initialize pygame modules
-pygame.init()
-game_window = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-clock = pygame.time.Clock()  # Clock for controlling game frame rate
-
-class GameComponent:
-    """Class to represent any drawable component in the game."""
-    def __init__(self, position, color):
-        self.position = position
-        self.color = color
-
-    def draw(self):
-        """Draw the component as a rectangle."""
-        pygame.draw.rect(game_window, self.color, pygame.Rect(
-            self.position[0], self.position[1], BLOCK_SIZE, BLOCK_SIZE))
-
-class Snake:
-    """Class to represent the snake."""
-    def __init__(self, positions):
-        self.body = [GameComponent(pos, COLORS["green"]) for pos in positions]
-        self.direction = 'RIGHT'
-        self.next_direction = 'RIGHT'
-
-    def move(self):
-        """Move the snake in the current direction."""
-        head_x, head_y = self.body[0].position
-        if self.next_direction == 'UP':
-            head_y -= BLOCK_SIZE
-        elif self.next_direction == 'DOWN':
-            head_y += BLOCK_SIZE
-        elif self.next_direction == 'LEFT':
-            head_x -= BLOCK_SIZE
-        elif self.next_direction == 'RIGHT':
-            head_x += BLOCK_SIZE
-        new_head = GameComponent([head_x, head_y], COLORS["green"])
-        self.body.insert(0, new_head)
-        self.body.pop()
-
-    def grow(self):
-        """Increase the size of the snake."""
-        tail_x, tail_y = self.body[-1].position
-        self.body.append(GameComponent([tail_x, tail_y], COLORS["green"]))
-
-    def check_collision(self, other):
-        """Check for collision with another game component."""
-        head_x, head_y = self.body[0].position
-        return head_x == other.position[0] and head_y == other.position[1]
-
-    def check_self_collision(self):
-        """Check if the snake has collided with itself."""
-        head_x, head_y = self.body[0].position
-        return any(head_x == part.position[0] and head_y == part.position[1] for part in self.body[1:])
-
-    def draw(self):
-        """Draw the snake on the game window."""
-        for part in self.body:
-            part.draw()
-
-class Fruit:
-    """Class to represent the fruit."""
-    def __init__(self):
-        self.position = [random.randrange(1, (WINDOW_WIDTH // BLOCK_SIZE)) * BLOCK_SIZE,
-                         random.randrange(1, (WINDOW_HEIGHT // BLOCK_SIZE)) * BLOCK_SIZE]
-        self.color = random.choice([COLORS["red"], COLORS["blue"], COLORS["yellow"]])
-        self.points = 10 if self.color == COLORS["red"] else 15 if self.color == COLORS["blue"] else 20
-
-    def respawn(self):
-        """Respawn the fruit at a new location."""
-        self.position = [random.randrange(1, (WINDOW_WIDTH // BLOCK_SIZE)) * BLOCK_SIZE,
-                         random.randrange(1, (WINDOW_HEIGHT // BLOCK_SIZE)) * BLOCK_SIZE]
-        self.color = random.choice([COLORS["red"], COLORS["blue"], COLORS["yellow"]])
-        self.points = 10 if self.color == COLORS["red"] else 15 if self.color == COLORS["blue"] else 20
-
-    def draw(self):
-        """Draw the fruit on the game window."""
-        pygame.draw.rect(game_window, self.color, pygame.Rect(
-            self.position[0], self.position[1], BLOCK_SIZE, BLOCK_SIZE))
-
-class Obstacle:
-    """Class to represent obstacles in the game."""
-    def __init__(self, number):
-        self.obstacles = []
-        for _ in range(number):
-            x = random.randrange(1, (WINDOW_WIDTH // BLOCK_SIZE)) * BLOCK_SIZE
-            y = random.randrange(1, (WINDOW_HEIGHT // BLOCK_SIZE)) * BLOCK_SIZE
-            self.obstacles.append(GameComponent([x, y], COLORS["grey"]))
-
-    def draw(self):
-        """Draw obstacles on the game window."""
-        for obstacle in self.obstacles:
-            obstacle.draw()
+# Display surface and clock, set by init() so importing this module opens no window
+game_window = None
+clock = None
+
+def init(surface=None):
+    """Draw on an existing display surface, or open a window when the game runs on its own."""
+    global game_window, clock
+    if surface is None:
+        pygame.init()
+        surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    game_window = surface
+    clock = pygame.time.Clock()  # Clock for controlling game frame rate
+
+# Font specs (name, size) for the shared text cache
+SCORE_FONT = fonts.font('times new roman', 20)
+MESSAGE_FONT = fonts.font('times new roman', 36)
+
+# Frames drawn (and inputs polled) per second; the snake itself moves at engine.speed ticks per second
+FRAME_RATE = 60
+MAX_STEPS_PER_FRAME = 5  # After a stall, drop the backlog of ticks instead of fast-forwarding through it
+
+def draw_cell(cell, color):
+    """Draw a single grid cell as a rectangle; fractional cells are drawn between grid positions."""
+    pygame.draw.rect(game_window, color, pygame.Rect(
+        round(cell[0] * BLOCK_SIZE), round(cell[1] * BLOCK_SIZE), BLOCK_SIZE, BLOCK_SIZE))
+
+def draw_game(engine, previous=None, alpha=1.0):
+    """Render the current state of a SnakeEngine onto the game window.
+
+    `previous` is the snake's body before the last tick; each segment is then drawn `alpha` of
+    the way from its old cell to its new one, so movement looks smooth between ticks.
+    """
+    game_window.fill(COLORS['black'])
+    if previous is None or alpha >= 1:
+        for part in engine.snake.body:
+            draw_cell(part, COLORS['green'])
+    else:
+        last = len(previous) - 1
+        for i, (x, y) in enumerate(engine.snake.body):
+            old_x, old_y = previous[min(i, last)]  # A segment added by growth starts on the old tail
+            draw_cell((old_x + (x - old_x) * alpha, old_y + (y - old_y) * alpha), COLORS['green'])
+    draw_cell(engine.fruit.position, COLORS[engine.fruit.color])
+    for obstacle in engine.obstacles.obstacles:
+        draw_cell(obstacle, COLORS['grey'])
+
+    score_surf = text_cache.render(SCORE_FONT, f'Score: {engine.score} Level: {engine.level}', COLORS['white'])
+    game_window.blit(score_surf, (5, 5))
+
+def draw_game_over(engine):
+    """Replace the board with the game over message and the final score."""
+    game_window.fill(COLORS['black'])
+    game_over_surf = text_cache.render(MESSAGE_FONT, 'Game Over', COLORS['red'])
+    score_surf = text_cache.render(MESSAGE_FONT, f'Final Score: {engine.score}', COLORS['yellow'])
+
+    game_window.blit(game_over_surf, (WINDOW_WIDTH / 2 - game_over_surf.get_width() / 2, WINDOW_HEIGHT / 2 - game_over_surf.get_height() / 2 - 20))
+    game_window.blit(score_surf, (WINDOW_WIDTH / 2 - score_surf.get_width() / 2, WINDOW_HEIGHT / 2 + 20))
+
+# Map arrow keys to the direction names used by the engine
+KEY_DIRECTIONS = {
+    pygame.K_UP: 'UP',
+    pygame.K_DOWN: 'DOWN',
+    pygame.K_LEFT: 'LEFT',
+    pygame.K_RIGHT: 'RIGHT'
+}
+# Directions are stored in recordings by their index in this list
+DIRECTION_NAMES = list(DIRECTIONS)
 
 def game_loop():
     pygame.display.set_caption('Snake Game!')  # Window title
     """Control the game's main loop including restarting and quitting."""
-    snake = Snake([[100 - i * BLOCK_SIZE, 50] for i in range(4)])
-    fruit = Fruit()
-    obstacles = Obstacle(5)  # Start with 5 obstacles
-    score = 0
-    level = 1
-    speed = INITIAL_SNAKE_SPEED
-    game_over = False
+    recording = replay.Recording('snake')  # Seed and inputs, so the session can be replayed headless
+    engine = SnakeEngine(recording.seed)
+    stats = profiler.get('snake')
+    previous = list(engine.snake.body)  # Body before the last tick, for drawing between ticks
+    accumulator = 0.0  # Milliseconds of game time not simulated yet
+    elapsed = 0  # Milliseconds since the previous frame
+    ending = None  # Game over screen timeline
+    clock.tick()
     running = True
     while running:
-        if not game_over:
-            game_window.fill(COLORS['black'])
-
+        if not engine.game_over:
+            stats.begin_frame()
+            with stats.section('events'):
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        running = False
+                    stats.handle_event(event)
+                    if event.type == pygame.KEYDOWN and event.key in KEY_DIRECTIONS:
+                        direction = KEY_DIRECTIONS[event.key]
+                        engine.snake.turn(direction)
+                        recording.record(engine.ticks, replay.TURN, DIRECTION_NAMES.index(direction))
+            if not running:
+                recording.record(engine.ticks, replay.QUIT)
+                break
+
+            # Fixed timestep: run as many ticks as the elapsed time covers at the current speed
+            with stats.section('update'):
+                step_time = 1000 / engine.speed
+                accumulator = min(accumulator + elapsed, MAX_STEPS_PER_FRAME * step_time)
+                while accumulator >= step_time and not engine.game_over:
+                    previous = list(engine.snake.body)
+                    engine.step()
+                    accumulator -= step_time
+                    step_time = 1000 / engine.speed  # The speed goes up on level changes
+                alpha = 1.0 if engine.game_over else accumulator / step_time
+
+            with stats.section('draw'):
+                draw_game(engine, previous, alpha)
+                stats.draw_overlay(game_window)
+            with stats.section('present'):
+                pygame.display.update()
+            elapsed = clock.tick(FRAME_RATE)
+            stats.end_frame(clock)
+        else:
+            # Hold the final frame for a second, then show the score for three, still handling events
+            if ending is None:
+                ending = tween.Timeline().wait(1000).call(lambda: draw_game_over(engine)).wait(3000)
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     running = False
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP and snake.direction != 'DOWN':
-                        snake.next_direction = 'UP'
-                    elif event.key == pygame.K_DOWN and snake.direction != 'UP':
-                        snake.next_direction = 'DOWN'
-                    elif event.key == pygame.K_LEFT and snake.direction != 'RIGHT':
-                        snake.next_direction = 'LEFT'
-                    elif event.key == pygame.K_RIGHT and snake.direction != 'LEFT':
-                        snake.next_direction = 'RIGHT'
-
-            snake.direction = snake.next_direction
-            snake.move()
-
-            if snake.check_collision(GameComponent(fruit.position, fruit.color)):
-                score += fruit.points
-                fruit.respawn()
-                snake.grow()
-                if score >= level * 100:
-                    level += 1
-                    speed = min(25, speed + 1)
-                    obstacles = Obstacle(5 + 2 * level)
-
-            if snake.check_self_collision() or \
-               snake.body[0].position[0] < 0 or snake.body[0].position[0] >= WINDOW_WIDTH or \
-               snake.body[0].position[1] < 0 or snake.body[0].position[1] >= WINDOW_HEIGHT:
-                game_over = True
-
-            # Check for collisions with obstacles
-            for obstacle in obstacles.obstacles:
-                if snake.check_collision(obstacle):
-                    game_over = True
-
-            snake.draw()
-            fruit.draw()
-            obstacles.draw()
-
-            font = pygame.font.SysFont('times new roman', 20)
-            score_surf = font.render(f'Score: {score} Level: {level}', True, COLORS['white'])
-            game_window.blit(score_surf, (5, 5))
-
+            ending.update(elapsed)
             pygame.display.update()
-            clock.tick(speed)
+            elapsed = clock.tick(FRAME_RATE)
+            if ending.done:
+                running = False
+
+    recording.finish(engine.score, engine.level, engine.ticks)
+    replay.save(recording)
+    stats.dump()
+
+def simulate(recording):
+    """Replay a recorded session without a display and return (score, level, ticks)."""
+    engine = SnakeEngine(recording.seed)
+    for tick, code, values in recording.inputs:
+        # Step up to the tick the input was applied on
+        while engine.ticks < tick and not engine.game_over:
+            engine.step()
+        if code == replay.TURN:
+            if len(values) != 1 or not 0 <= values[0] < len(DIRECTION_NAMES):
+                raise replay.illegal(tick, code, values)
+            engine.snake.turn(DIRECTION_NAMES[values[0]])
+        elif code == replay.QUIT:
+            return engine.score, engine.level, engine.ticks
         else:
-            pygame.time.wait(1000)
-
-            game_window.fill(COLORS['black'])
-            font_big = pygame.font.SysFont('times new roman', 36)
-            game_over_surf = font_big.render('Game Over', True, COLORS['red'])
-            score_surf = font_big.render(f'Final Score: {score}', True, COLORS['yellow'])
-
-            game_window.blit(game_over_surf, (WINDOW_WIDTH / 2 - game_over_surf.get_width() / 2, WINDOW_HEIGHT / 2 - game_over_surf.get_height() / 2 - 20))
-            game_window.blit(score_surf, (WINDOW_WIDTH / 2 - score_surf.get_width() / 2, WINDOW_HEIGHT / 2 + 20))
-
-            pygame.display.update()
-            pygame.time.wait(3000)
-            running = False
+            raise replay.illegal(tick, code, values)
+    # Without further input the snake runs straight until it hits something
+    while not engine.game_over:
+        engine.step()
+    return engine.score, engine.level, engine.ticks
 
 # Define run_game_[game] for arcade interface.
 def run_game_snake():
     print("Starting Snake Game...")
+    if game_window is None:
+        init()
+    fonts.warm_up()  # Resolve fonts before the first frame
     game_loop()  # Start the Game
 
 
@@ -0,0 +1,221 @@
+# Snake Game - headless simulation core
+# Pure-Python game logic with no pygame dependency, so sessions can be stepped
+# without a display (bot evaluation, replay validation). snake.py renders on top.
+import random
+from collections import deque
+
+# Board dimensions, kept in sync with the Snake game window
+WINDOW_WIDTH, WINDOW_HEIGHT = 800, 600
+BLOCK_SIZE = 10  # Size of each block of snake and fruit in pixels
+GRID_WIDTH = WINDOW_WIDTH // BLOCK_SIZE  # Number of cells in each row
+GRID_HEIGHT = WINDOW_HEIGHT // BLOCK_SIZE  # Number of cells in each column
+
+INITIAL_SNAKE_SPEED = 10  # Initial speed of the snake (ticks per second)
+MAX_SNAKE_SPEED = 25  # Speed cap reached at higher levels
+INITIAL_OBSTACLES = 5  # Obstacles placed at level 1
+
+# Fruit kinds as (color name, points); the renderer maps names to RGB values
+FRUIT_KINDS = (('red', 10), ('blue', 15), ('yellow', 20))
+
+# Movement per direction in grid cells, and the direction that cannot follow each one
+DIRECTIONS = {'UP': (0, -1), 'DOWN': (0, 1), 'LEFT': (-1, 0), 'RIGHT': (1, 0)}
+OPPOSITE = {'UP': 'DOWN', 'DOWN': 'UP', 'LEFT': 'RIGHT', 'RIGHT': 'LEFT'}
+
+
+def random_cell(rng):
+    """Pick a random cell, never in the first row or column (same rule as the original game)."""
+    return (rng.randrange(1, GRID_WIDTH), rng.randrange(1, GRID_HEIGHT))
+
+
+def spawnable(cell):
+    """Whether fruit or obstacles may be placed on a cell (the same area random_cell picks from)."""
+    return 0 < cell[0] < GRID_WIDTH and 0 < cell[1] < GRID_HEIGHT
+
+
+# Every spawnable cell and its slot, built once; each new session starts from copies of these
+SPAWNABLE_CELLS = [(x, y) for x in range(1, GRID_WIDTH) for y in range(1, GRID_HEIGHT)]
+SPAWNABLE_INDEX = {cell: i for i, cell in enumerate(SPAWNABLE_CELLS)}
+
+
+class FreeCells:
+    """Indexed set of the cells that are free to spawn on, with O(1) add, remove and random choice.
+
+    Cells live in a list and a dict maps each cell to its slot; removing a cell moves the last
+    cell into its slot, so the list never has holes and choice() is a single randrange.
+    """
+    def __init__(self, cells=()):
+        self.cells = list(cells)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+
+    @classmethod
+    def everywhere(cls):
+        """Every spawnable cell; copying the prebuilt list and index is much faster than rebuilding them."""
+        free = cls()
+        free.cells = SPAWNABLE_CELLS.copy()
+        free.index = SPAWNABLE_INDEX.copy()
+        return free
+
+    def __len__(self):
+        return len(self.cells)
+
+    def __contains__(self, cell):
+        return cell in self.index
+
+    def add(self, cell):
+        if cell not in self.index and spawnable(cell):
+            self.index[cell] = len(self.cells)
+            self.cells.append(cell)
+
+    def discard(self, cell):
+        i = self.index.pop(cell, None)
+        if i is not None:
+            last = self.cells.pop()
+            if i < len(self.cells):  # Fill the hole with the former last cell
+                self.cells[i] = last
+                self.index[last] = i
+
+    def take(self, rng):
+        """Remove and return a random free cell."""
+        cell = self.cells[rng.randrange(len(self.cells))]
+        self.discard(cell)
+        return cell
+
+
+class Snake:
+    """Class to represent the snake as a deque of (x, y) grid cells, head first."""
+    def __init__(self, positions):
+        self.body = deque(tuple(pos) for pos in positions)
+        self.occupied = set(self.body)  # Cells covered by the body, for O(1) collision checks
+        self.direction = 'RIGHT'
+        self.next_direction = 'RIGHT'
+        self.pending_growth = 0  # Segments still to be added at the tail
+        self.self_collision = False
+        self.vacated = None  # Cell the tail left on the last move (None while growing)
+
+    @property
+    def head(self):
+        return self.body[0]
+
+    def turn(self, direction):
+        """Queue a direction change, ignoring a reversal onto the snake's own neck."""
+        if direction in DIRECTIONS and direction != OPPOSITE[self.direction]:
+            self.next_direction = direction
+
+    def move(self):
+        """Move the snake one cell in the queued direction."""
+        self.direction = self.next_direction
+        dx, dy = DIRECTIONS[self.direction]
+        head_x, head_y = self.body[0]
+        new_head = (head_x + dx, head_y + dy)
+        if self.pending_growth:
+            self.pending_growth -= 1  # Keep the tail in place to grow by one segment
+            self.vacated = None
+        else:
+            self.vacated = self.body.pop()  # The tail moves out before the head moves in
+            self.occupied.discard(self.vacated)
+        self.self_collision = new_head in self.occupied
+        self.body.appendleft(new_head)
+        self.occupied.add(new_head)
+
+    def grow(self):
+        """Increase the size of the snake by one segment on the next move."""
+        self.pending_growth += 1
+
+    def check_collision(self, position):
+        """Check whether the head is on the given cell."""
+        return self.body[0] == tuple(position)
+
+    def check_self_collision(self):
+        """Check if the last move ran the snake into itself."""
+        return self.self_collision
+
+    def out_of_bounds(self):
+        """Check if the head has left the board."""
+        head_x, head_y = self.body[0]
+        return head_x < 0 or head_x >= GRID_WIDTH or head_y < 0 or head_y >= GRID_HEIGHT
+
+
+class Fruit:
+    """Class to represent the fruit, placed on a cell taken from the free-cell index."""
+    def __init__(self, rng, free):
+        self.rng = rng
+        self.free = free
+        self.respawn()
+
+    def respawn(self):
+        """Respawn the fruit at a new free location with a new color."""
+        self.position = self.free.take(self.rng)
+        self.color, self.points = self.rng.choice(FRUIT_KINDS)
+
+
+class Obstacle:
+    """Class to represent obstacles in the game, placed on cells taken from the free-cell index."""
+    def __init__(self, number, rng, free):
+        self.free = free
+        # A set so that checking the snake's head against obstacles is a hash lookup
+        self.obstacles = {free.take(rng) for _ in range(min(number, len(free)))}
+
+    def clear(self):
+        """Give the obstacle cells back to the free-cell index."""
+        for cell in self.obstacles:
+            self.free.add(cell)
+        self.obstacles = set()
+
+
+class SnakeEngine:
+    """Headless Snake session: holds the snake, fruit, obstacles and score, advanced by step()."""
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.reset()
+
+    def reset(self, seed=None):
+        """Start a new session, optionally reseeding the random generator."""
+        if seed is not None:
+            self.rng.seed(seed)
+        self.snake = Snake([(10 - i, 5) for i in range(4)])
+        # Cells not covered by the snake, the fruit or an obstacle; kept up to date every tick
+        self.free = FreeCells.everywhere()
+        for cell in self.snake.body:
+            self.free.discard(cell)
+        self.fruit = Fruit(self.rng, self.free)
+        self.obstacles = Obstacle(INITIAL_OBSTACLES, self.rng, self.free)
+        self.score = 0
+        self.level = 1
+        self.speed = INITIAL_SNAKE_SPEED
+        self.ticks = 0
+        self.game_over = False
+
+    def step(self, action=None):
+        """Advance one tick. `action` is an optional direction name; returns the points scored."""
+        if self.game_over:
+            return 0
+        snake = self.snake
+        if action is not None:
+            snake.turn(action)
+        snake.move()
+        self.ticks += 1
+        if snake.vacated is not None:
+            self.free.add(snake.vacated)
+        self.free.discard(snake.head)
+
+        points = 0
+        if snake.check_collision(self.fruit.position):
+            points = self.fruit.points
+            self.score += points
+            snake.grow()
+            if not self.free:  # The snake fills the board; there is nowhere left to play
+                self.game_over = True
+                return points
+            self.fruit.respawn()
+            if self.score >= self.level * 100:
+                self.level += 1
+                self.speed = min(MAX_SNAKE_SPEED, self.speed + 1)
+                self.obstacles.clear()
+                self.obstacles = Obstacle(INITIAL_OBSTACLES + 2 * self.level, self.rng, self.free)
+
+        if snake.check_self_collision() or snake.out_of_bounds():
+            self.game_over = True
+        # Check for collisions with obstacles
+        elif snake.head in self.obstacles.obstacles:
+            self.game_over = True
+        return points
@@ -0,0 +1,208 @@
+# Snake Game - batched simulation for training
+# Steps N independent Snake boards at once with NumPy, following the same rules
+# as SnakeEngine in snake_engine.py (movement, growth, fruit, levels and speed). Fruit and
+# obstacles spawn only on free cells, as with the engine's FreeCells; the random draws differ,
+# so a board does not replay an engine session with the same seed.
+import numpy as np
+
+from games.snake_engine import (GRID_WIDTH, GRID_HEIGHT, INITIAL_SNAKE_SPEED, MAX_SNAKE_SPEED,
+                                INITIAL_OBSTACLES, FRUIT_KINDS)
+
+# Actions are direction indices; NOOP keeps the current direction.
+# Opposite directions differ only in the lowest bit (UP^1 == DOWN, LEFT^1 == RIGHT).
+UP, DOWN, LEFT, RIGHT, NOOP = 0, 1, 2, 3, 4
+ACTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+DX = np.array([0, 0, -1, 1], dtype=np.int32)
+DY = np.array([-1, 1, 0, 0], dtype=np.int32)
+FRUIT_POINTS = np.array([points for _, points in FRUIT_KINDS], dtype=np.int32)
+
+# Values written by observe()
+EMPTY, BODY, HEAD, FRUIT, OBSTACLE = 0, 1, 2, 3, 4
+
+
+class VectorSnakeEnv:
+    """N Snake boards held as arrays and stepped together; finished boards reset automatically."""
+    def __init__(self, num_boards, seed=None, width=GRID_WIDTH, height=GRID_HEIGHT):
+        self.num_boards = num_boards
+        self.width = width
+        self.height = height
+        self.capacity = width * height + 1  # Longest possible snake, plus the new head
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.arange(num_boards)
+
+        # Body ring buffer of flat cell indices; head at head_ptr, tail `length - 1` slots behind
+        self.body = np.zeros((num_boards, self.capacity), dtype=np.int32)
+        self.head_ptr = np.zeros(num_boards, dtype=np.int64)
+        self.length = np.zeros(num_boards, dtype=np.int64)
+        self.head_x = np.zeros(num_boards, dtype=np.int32)
+        self.head_y = np.zeros(num_boards, dtype=np.int32)
+        self.direction = np.full(num_boards, RIGHT, dtype=np.int32)
+        self.pending_growth = np.zeros(num_boards, dtype=np.int32)
+
+        # Per-board grids, stored flat (row-major, index = y * width + x)
+        self.occupied = np.zeros((num_boards, width * height), dtype=bool)
+        self.obstacles = np.zeros((num_boards, width * height), dtype=bool)
+        self.fruit = np.zeros((num_boards, width * height), dtype=bool)
+        self.fruit_cell = np.zeros(num_boards, dtype=np.int64)
+        self.fruit_kind = np.zeros(num_boards, dtype=np.int32)
+
+        self.score = np.zeros(num_boards, dtype=np.int32)
+        self.level = np.ones(num_boards, dtype=np.int32)
+        self.speed = np.full(num_boards, INITIAL_SNAKE_SPEED, dtype=np.int32)
+        self.final_score = np.zeros(num_boards, dtype=np.int32)  # Score of each board's last finished game
+
+        # Cells fruit and obstacles may spawn on: never in the first row or column (see spawnable)
+        area = np.zeros((height, width), dtype=bool)
+        area[1:, 1:] = True
+        self.spawn_area = area.ravel()
+
+        self.reset()
+
+    def _free_cells(self, boards, count):
+        """Pick `count` distinct random free cells on each board, like FreeCells.take().
+
+        Free cells are in the spawn area and not covered by the snake, an obstacle or the fruit. Every
+        free cell gets a random key and the highest keys win. Returns (cells, valid), both shaped
+        (len(boards), count); `valid` is False where a board has fewer free cells than asked for.
+        """
+        free = self.spawn_area & ~(self.occupied[boards] | self.obstacles[boards] | self.fruit[boards])
+        keys = np.where(free, self.rng.random(free.shape), -1.0)
+        count = min(count, free.shape[1])
+        if count == 1:
+            cells = keys.argmax(axis=1)[:, None]
+        else:
+            cells = np.argpartition(-keys, count - 1, axis=1)[:, :count]
+        return cells, np.take_along_axis(free, cells, axis=1)
+
+    def _free_cell(self, boards, tries=4):
+        """One random free cell per board, as _free_cells(boards, 1) but faster on mostly empty boards.
+
+        Random cells of the spawn area are drawn until they land on a free cell, which is still uniform
+        over the free cells; boards that miss `tries` times fall back to _free_cells.
+        """
+        cells = np.zeros(len(boards), dtype=np.int64)
+        valid = np.zeros(len(boards), dtype=bool)
+        pending = np.arange(len(boards))
+        for _ in range(tries):
+            x = self.rng.integers(1, self.width, size=len(pending))
+            y = self.rng.integers(1, self.height, size=len(pending))
+            drawn = y * self.width + x
+            board = boards[pending]
+            hit = ~(self.occupied[board, drawn] | self.obstacles[board, drawn] | self.fruit[board, drawn])
+            cells[pending[hit]] = drawn[hit]
+            valid[pending[hit]] = True
+            pending = pending[~hit]
+            if not len(pending):
+                return cells, valid
+        crowded, crowded_valid = self._free_cells(boards[pending], 1)
+        cells[pending], valid[pending] = crowded[:, 0], crowded_valid[:, 0]
+        return cells, valid
+
+    def _respawn_fruit(self, boards):
+        """Move the fruit of the given boards to free cells; returns False for boards with none left."""
+        self.fruit[boards, self.fruit_cell[boards]] = False
+        cells, valid = self._free_cell(boards)
+        self.fruit_cell[boards] = cells
+        self.fruit_kind[boards] = self.rng.integers(0, len(FRUIT_KINDS), size=len(boards))
+        self.fruit[boards[valid], cells[valid]] = True
+        return valid
+
+    def _place_obstacles(self, boards, count):
+        """Replace the obstacles of the given boards with `count` obstacles on free cells (fewer if full)."""
+        self.obstacles[boards] = False
+        cells, valid = self._free_cells(boards, count)
+        rows = np.broadcast_to(boards[:, None], cells.shape)
+        self.obstacles[rows[valid], cells[valid]] = True
+
+    def reset(self, boards=None):
+        """Start new games on the given boards (all boards by default)."""
+        boards = self.boards if boards is None else np.asarray(boards)
+        if len(boards) == 0:
+            return
+        self.occupied[boards] = False
+        self.obstacles[boards] = False
+        self.fruit[boards] = False
+
+        # Same starting snake as SnakeEngine: four cells on row 5, head at x = 10, moving right
+        start_x = np.arange(7, 11)
+        cells = 5 * self.width + start_x
+        self.body[boards, :4] = cells
+        self.occupied[boards[:, None], cells] = True
+        self.head_ptr[boards] = 3
+        self.length[boards] = 4
+        self.head_x[boards] = 10
+        self.head_y[boards] = 5
+        self.direction[boards] = RIGHT
+        self.pending_growth[boards] = 0
+
+        # Fruit first, then obstacles on the cells left free, in the engine's order
+        self._respawn_fruit(boards)
+        self._place_obstacles(boards, INITIAL_OBSTACLES)
+
+        self.score[boards] = 0
+        self.level[boards] = 1
+        self.speed[boards] = INITIAL_SNAKE_SPEED
+
+    def step(self, actions):
+        """Advance every board by one tick. Returns (points scored, boards whose game ended)."""
+        boards = self.boards
+        actions = np.asarray(actions)
+
+        # Turn, ignoring reversals onto the neck
+        turning = (actions < NOOP) & (actions != (self.direction ^ 1))
+        self.direction = np.where(turning, actions, self.direction).astype(np.int32)
+
+        new_x = self.head_x + DX[self.direction]
+        new_y = self.head_y + DY[self.direction]
+        out = (new_x < 0) | (new_x >= self.width) | (new_y < 0) | (new_y >= self.height)
+        inside = ~out
+        new_cell = np.where(out, 0, new_y * self.width + new_x)
+
+        # The tail moves out before the head moves in, unless the snake is growing
+        growing = self.pending_growth > 0
+        moving = boards[~growing]
+        tail_ptr = (self.head_ptr[moving] - self.length[moving] + 1) % self.capacity
+        self.occupied[moving, self.body[moving, tail_ptr]] = False
+        self.length += growing
+        self.pending_growth -= growing
+
+        self_hit = inside & self.occupied[boards, new_cell]
+        self.head_ptr = (self.head_ptr + 1) % self.capacity
+        self.body[boards, self.head_ptr] = new_cell
+        self.occupied[boards[inside], new_cell[inside]] = True
+        self.head_x, self.head_y = new_x, new_y
+
+        # Fruit: score it, grow, respawn and check for a level up
+        ate = inside & self.fruit[boards, new_cell]
+        rewards = np.where(ate, FRUIT_POINTS[self.fruit_kind], 0).astype(np.int32)
+        eaters = boards[ate]
+        full = np.zeros(self.num_boards, dtype=bool)  # The snake fills the board; the game ends
+        if len(eaters):
+            self.score += rewards
+            self.pending_growth[eaters] += 1
+            respawned = self._respawn_fruit(eaters)
+            full[eaters[~respawned]] = True
+            eaters = eaters[respawned]
+            leveled = eaters[self.score[eaters] >= self.level[eaters] * 100]
+            if len(leveled):
+                self.level[leveled] += 1
+                self.speed[leveled] = np.minimum(MAX_SNAKE_SPEED, self.speed[leveled] + 1)
+                # The obstacle count depends on the level, so boards are grouped by their new level
+                for level in np.unique(self.level[leveled]):
+                    self._place_obstacles(leveled[self.level[leveled] == level], INITIAL_OBSTACLES + 2 * int(level))
+
+        dones = out | self_hit | full | (inside & self.obstacles[boards, new_cell])
+        finished = boards[dones]
+        if len(finished):
+            self.final_score[finished] = self.score[finished]
+            self.reset(finished)
+        return rewards, dones
+
+    def observe(self):
+        """Return an (N, height, width) int8 grid of EMPTY/BODY/HEAD/FRUIT/OBSTACLE values."""
+        grid = np.zeros((self.num_boards, self.width * self.height), dtype=np.int8)
+        grid[self.obstacles] = OBSTACLE
+        grid[self.occupied] = BODY
+        grid[self.fruit] = FRUIT
+        grid[self.boards, self.body[self.boards, self.head_ptr]] = HEAD
+        return grid.reshape(self.num_boards, self.height, self.width)
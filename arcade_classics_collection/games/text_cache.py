@@ -0,0 +1,29 @@
+# Shared cache of rendered text for all games and the launcher
+# Text is rasterized once per (font, size, text, color) and the surface is reused on later frames.
+from collections import OrderedDict
+
+from games.fonts import get_font
+
+MAX_ENTRIES = 512  # Least recently used surfaces are dropped beyond this many
+
+# Fonts are (name, size) specs from the font registry in fonts.py
+_surfaces = OrderedDict()
+
+
+def render(font, text, color, background=None):
+    """Return an anti-aliased surface for `text`, rendering it only if it is not cached yet."""
+    key = (font, text, color, background)
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = get_font(font).render(text, True, color, background)
+        _surfaces[key] = surface
+        if len(_surfaces) > MAX_ENTRIES:
+            _surfaces.popitem(last=False)
+    else:
+        _surfaces.move_to_end(key)
+    return surface
+
+
+def clear():
+    """Drop every cached surface, e.g. after the display mode changed."""
+    _surfaces.clear()
@@ -0,0 +1,50 @@
+# Tweens and timelines for animations that never block the game loop
+# A loop keeps handling events and calls update() with the milliseconds since its last frame;
+# a timeline plays its steps one after another and tells the loop when it is done. Game logic
+# never waits for an animation, so recordings replay the same with or without them.
+
+
+def linear(t):  # Easing functions map a step's time fraction to its progress, both from 0 to 1
+    return t
+
+
+class Timeline:
+    """Tween steps played in order by update(dt).
+
+    A step lasts `duration` milliseconds; its `update(progress)` callback runs every frame with the
+    eased progress from 0 to 1, and `end()` runs once when the step finishes. Steps are added with
+    the chainable then(), wait() and call().
+    """
+    def __init__(self):
+        self.steps = []  # (duration, easing, update, end)
+        self.current = 0  # Index of the step being played
+        self.elapsed = 0  # Milliseconds into the current step
+
+    def then(self, duration, update=None, end=None, easing=linear):
+        self.steps.append((duration, easing, update, end))
+        return self
+
+    def wait(self, duration):
+        return self.then(duration)
+
+    def call(self, function):
+        return self.then(0, end=function)
+
+    @property
+    def done(self):
+        return self.current >= len(self.steps)
+
+    def update(self, dt):
+        """Advance by `dt` milliseconds; a long frame may finish several steps at once."""
+        self.elapsed += dt
+        while not self.done:
+            duration, easing, update, end = self.steps[self.current]
+            finished = self.elapsed >= duration
+            if update is not None:
+                update(easing(min(self.elapsed / duration, 1.0)) if duration > 0 else 1.0)
+            if not finished:
+                return
+            if end is not None:
+                end()
+            self.elapsed -= duration
+            self.current += 1
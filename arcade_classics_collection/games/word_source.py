@@ -0,0 +1,196 @@
+# Word sources for Hangman
+# A theme's words come from words/<theme>.txt when that file exists (UTF-8, one word per line, any
+# size), otherwise from the game's short built-in list. A word file is never read into memory: it is
+# memory-mapped and indexed once by word length, difficulty and letter. The index is cached in
+# words/.cache and reused until the file changes, so opening a theme is fast and sampling is O(1).
+import array
+import mmap
+import os
+import struct
+
+WORDS_DIR = 'words'  # Word files, named after the theme in lower case
+CACHE_DIR = '.cache'  # Folder next to the word files that holds their indexes
+INDEX_MAGIC = b'AWX1'  # Arcade Word indeX, format version 1
+MAX_TRIES = 64  # Random picks tried for combined filters before scanning the smallest bucket
+
+_sources = {}
+
+
+def get(theme, builtin, alphabet):
+    """Return the word source of a theme, opening it the first time the theme is played.
+
+    `builtin` is the word list used when there is no word file, or when the file has no guessable
+    word: words with letters missing from `alphabet` (the letters on the keyboard) are left out.
+    """
+    path = os.path.join(WORDS_DIR, f'{theme.lower()}.txt')
+    key = (theme, os.path.exists(path))  # A word file added while running takes over the theme
+    if key not in _sources:
+        source = FileSource(path, alphabet) if key[1] else None
+        _sources[key] = source if source is not None and len(source) else ListSource(builtin)
+    return _sources[key]
+
+
+def difficulty(word):
+    """'easy', 'medium' or 'hard'; words with few distinct letters leave few letters to hit."""
+    distinct = len(set(word))
+    return 'hard' if distinct <= 4 else 'medium' if distinct <= 7 else 'easy'
+
+
+def _matches(word, length, level, letters):
+    return ((length is None or len(word) == length) and (level is None or difficulty(word) == level)
+            and all(letter in word for letter in letters))
+
+
+class ListSource:
+    """A short list of words kept in memory; sampling without filters is the game's old rng.choice()."""
+    def __init__(self, words):
+        self.words = [word.upper() for word in words]
+
+    def __len__(self):
+        return len(self.words)
+
+    def sample(self, rng, length=None, level=None, letters=''):
+        """Pick a random word with the given length, difficulty and letters (all optional)."""
+        if length is None and level is None and not letters:
+            return rng.choice(self.words)
+        candidates = [word for word in self.words if _matches(word, length, level, letters.upper())]
+        if not candidates:
+            raise ValueError(f"No word matches length={length}, level={level}, letters={letters!r}.")
+        return rng.choice(candidates)
+
+
+class FileSource:
+    """A word file, memory-mapped and indexed by buckets of word offsets.
+
+    Buckets are 'all', 'length:<n>', 'level:<difficulty>' and 'letter:<letter>'; each holds the byte
+    offsets of the matching words as uint32 values, read straight from the memory-mapped index cache.
+    """
+    def __init__(self, path, alphabet):
+        self.path = path
+        self.alphabet = alphabet
+        self.words = None  # Memory map of the word file, opened on first use
+        self.buckets = None
+
+    def __len__(self):
+        return len(self._bucket('all'))
+
+    def sample(self, rng, length=None, level=None, letters=''):
+        """Pick a random word with the given length, difficulty and letters (all optional).
+
+        A single filter picks straight from its bucket. Combined filters pick from the smallest bucket
+        until a word matches the others, and scan that bucket only if MAX_TRIES picks all miss.
+        """
+        letters = letters.upper()
+        keys = ['all'] if length is None else [f'length:{length}']
+        if level is not None:
+            keys.append(f'level:{level}')
+        keys += [f'letter:{letter}' for letter in letters]
+        bucket = min((self._bucket(key) for key in keys), key=len)
+        if len(bucket):
+            for _ in range(MAX_TRIES if len(keys) > 1 else 1):
+                word = self._word(bucket[rng.randrange(len(bucket))])
+                if _matches(word, length, level, letters):
+                    return word
+            candidates = [offset for offset in bucket if _matches(self._word(offset), length, level, letters)]
+            if candidates:
+                return self._word(rng.choice(candidates))
+        raise ValueError(f"No word in {self.path} matches length={length}, level={level}, letters={letters!r}.")
+
+    def _word(self, offset):
+        end = self.words.find(b'\n', offset)
+        return self.words[offset:end if end >= 0 else len(self.words)].decode('utf-8').strip().upper()
+
+    def _bucket(self, key):
+        if self.buckets is None:
+            self._open()
+        return self.buckets.get(key, ())
+
+    def _open(self):
+        with open(self.path, 'rb') as word_file:
+            size = os.fstat(word_file.fileno()).st_size
+            # mmap cannot map an empty file; an empty bytes object searches the same way
+            self.words = mmap.mmap(word_file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        stat = os.stat(self.path)
+        header = INDEX_MAGIC + struct.pack('<QQ', stat.st_size, stat.st_mtime_ns) + _pack_text(self.alphabet)
+        folder, name = os.path.split(self.path)
+        cache_path = os.path.join(folder, CACHE_DIR, name + '.idx')
+        self.buckets = self._read_cache(cache_path, header)
+        if self.buckets is None:
+            self.buckets = self._build()
+            try:
+                self._write_cache(cache_path, header)
+            except OSError:
+                pass  # A read-only folder only means the index is built again next time
+
+    def _build(self):
+        """Index every guessable word by streaming through the mapped file once."""
+        alphabet = set(self.alphabet)
+        buckets = {}
+        offset = 0
+        while offset < len(self.words):
+            end = self.words.find(b'\n', offset)
+            end = len(self.words) if end < 0 else end
+            try:
+                word = self.words[offset:end].decode('utf-8').strip().upper()
+            except UnicodeDecodeError:
+                word = ''
+            if word and set(word) <= alphabet:
+                keys = ['all', f'length:{len(word)}', f'level:{difficulty(word)}']
+                keys += [f'letter:{letter}' for letter in set(word)]
+                for key in keys:
+                    if key not in buckets:
+                        buckets[key] = array.array('I')
+                    buckets[key].append(offset)
+            offset = end + 1
+        return buckets
+
+    def _write_cache(self, cache_path, header):
+        # Header, then a directory of (name, data offset, count), then the uint32 arrays, 4-byte aligned
+        names = sorted(self.buckets)
+        directory_size = 4 + sum(len(_pack_text(name)) + 12 for name in names)
+        position = len(header) + directory_size
+        position += -position % 4
+        directory = bytearray(struct.pack('<I', len(names)))
+        for name in names:
+            directory += _pack_text(name) + struct.pack('<QI', position, len(self.buckets[name]))
+            position += 4 * len(self.buckets[name])
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path + '.tmp', 'wb') as cache_file:
+            cache_file.write(header + directory)
+            cache_file.write(bytes(-(len(header) + len(directory)) % 4))
+            for name in names:
+                cache_file.write(self.buckets[name].tobytes())
+        os.replace(cache_path + '.tmp', cache_path)  # Never leave a half-written index behind
+
+    @staticmethod
+    def _read_cache(cache_path, header):
+        """Buckets as uint32 views of the memory-mapped cache, or None if it is missing or stale."""
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                if cache_file.read(len(header)) != header:
+                    return None
+                data = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            count, = struct.unpack_from('<I', data, len(header))
+            position = len(header) + 4
+            buckets = {}
+            for _ in range(count):
+                name, position = _unpack_text(data, position)
+                start, length = struct.unpack_from('<QI', data, position)
+                position += 12
+                buckets[name] = memoryview(data)[start:start + 4 * length].cast('I')
+            return buckets
+        except (struct.error, UnicodeDecodeError, TypeError, ValueError):
+            return None
+
+
+def _pack_text(text):
+    encoded = text.encode('utf-8')
+    return struct.pack('<H', len(encoded)) + encoded
+
+
+def _unpack_text(data, position):
+    length, = struct.unpack_from('<H', data, position)
+    return bytes(data[position + 2:position + 2 + length]).decode('utf-8'), position + 2 + length